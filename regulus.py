@@ -4,14 +4,43 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
+from selenium.common.exceptions import TimeoutException
+from bs4 import BeautifulSoup, FeatureNotFound
 import pandas as pd
-from datetime import datetime
+from datetime import date, datetime
+import argparse
+import hashlib
+import json
 import os
 import time
 import re
-import requests
-import fitz  # PyMuPDF
+import threading
+
+from scraper.schema import (
+    NOTICE_COLUMNS, Notice, coerce_notices, frame_to_notices, notices_to_frame, read_notices_csv, write_notices_csv,
+    to_excel_frame,
+)
+from scraper.history import list_partitions, load_history, partition_path, quarter_bounds, write_partitions
+from scraper.backfill import run_backfill
+from scraper.change_tracker import REPORTS_DIR, iter_changes, write_change_report
+from scraper.aggregates import eccn_summary, keyword_summary, load_aggregates, update_aggregates
+from scraper import (
+    aggregates, change_tracker, citation_graph, eccn_feed, extractors, http_cache, metrics, near_dup, pdf_store, profiling, rate_limit,
+    scheduler, sections, site, watchlists,
+)
+from scraper.citation_graph import GRAPH_PATH as CITATION_GRAPH_PATH, update_citation_graph
+from scraper.pipeline import Pipeline, Stage, code_version, digest, file_digest
+from scraper.eccn_feed import update_eccn_feed
+from scraper.extractors import hits_to_fields, scan_page_items
+from scraper.job_queue import QUEUE_PATH, VISIBILITY_TIMEOUT, JobQueue, worker_id
+from scraper.near_dup import (
+    LINKS_PATH as DUPLICATE_LINKS_PATH, NearDuplicateIndex, SignatureRecorder, write_duplicate_links,
+)
+from scraper.sections import extract_relevant_pages
+from scraper.site import SITE_DIR, build_site
+from scraper.watchlists import (
+    RESULTS_DIR as WATCHLIST_RESULTS_DIR, WATCHLISTS_PATH, load_watchlists, write_subscription_results,
+)
 
 def setup_driver():
     """Set up and configure Chrome WebDriver for headless operation."""
@@ -26,7 +55,7 @@ def setup_driver():
 
 MAX_PDF_SIZE_MB = 5
 
-from urllib.parse import urlparse
+from urllib.parse import urljoin, urlparse
 
 def is_valid_pdf_url(url):
     try:
@@ -35,39 +64,80 @@ def is_valid_pdf_url(url):
     except Exception:
         return False
 
-def download_pdf(url, folder="data/pdfs"):
-    """Download a PDF from a validated URL with size and content-type checks."""
+PERSIST_MODES = ("all", "matching", "none")
+
+_pdf_buffers = threading.local()
+
+def pdf_buffer():
+    """This thread's reusable download buffer, sized to the PDF size cap."""
+    buffer = getattr(_pdf_buffers, "buffer", None)
+    if buffer is None:
+        buffer = _pdf_buffers.buffer = bytearray(MAX_PDF_SIZE_MB * 1024 * 1024)
+    return buffer
+
+def fetch_pdf(url, store_dir="data/blobs"):
+    """Download a PDF into memory with size and content-type checks.
+
+    Returns:
+        (sha, data, fresh). For a new download data is a memoryview into
+        this thread's reusable buffer, valid until the thread's next
+        fetch_pdf, and fresh is True; for a URL stored before, data is the
+        stored document. (None, None, False) if the PDF was skipped.
+    """
     if not is_valid_pdf_url(url):
         print(f"❌ Skipped invalid URL: {url}")
-        return None
+        return None, None, False
+
+    sha = pdf_store.lookup_url(url, store_dir)
+    if sha:
+        print(f"♻️ PDF already stored: {url}")
+        return sha, pdf_store.read_blob(sha, store_dir), False
 
     try:
-        head = requests.head(url, timeout=5, allow_redirects=True)
+        head = http_cache.head(url, timeout=5)
         content_type = head.headers.get("Content-Type", "")
         size_bytes = int(head.headers.get("Content-Length", 0))
         if size_bytes > MAX_PDF_SIZE_MB * 1024 * 1024:
             print(f"⚠️ Skipped large file ({size_bytes/1e6:.2f} MB): {url}")
-            return None
+            return None, None, False
         if 'application/pdf' not in content_type.lower():
             print(f"❌ Skipped non-PDF content type ({content_type}): {url}")
-            return None
+            return None, None, False
 
-        response = requests.get(url, stream=True, timeout=10, allow_redirects=True)
+        # The blob store already keeps every PDF, so only the HEAD is cached
+        buffer = pdf_buffer()
+        response, length = http_cache.read_into(url, buffer, timeout=10)
         if response.status_code == 200:
-            os.makedirs(folder, exist_ok=True)
-            filename = os.path.basename(urlparse(url).path) or f"pdf_{int(time.time())}.pdf"
-            output_path = os.path.join(folder, filename)
-            with open(output_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            print(f"✅ PDF saved: {output_path}")
-            return output_path
+            data = memoryview(buffer)[:length]
+            return hashlib.sha256(data).hexdigest(), data, True
         else:
             print(f"❌ HTTP error {response.status_code}: {url}")
-            return None
+            return None, None, False
     except Exception as e:
         print(f"❌ Failed to download {url}: {e}")
-        return None
+        return None, None, False
+
+# What process_notice learns from a PDF, as stored in the master history
+ANALYSIS_FIELDS = [
+    "pdf_downloaded", "pdf_sha256", "contains_eccn", "eccn_count", "eccns_found", "fr_citations", "cfr_sections",
+    "ear_references", "license_exceptions", "countries", "watch_terms", "canonical_url",
+]
+_recorded = None
+_recorded_lock = threading.Lock()
+
+def recorded_analysis(url):
+    """The stored analysis of a notice, for replays of PDFs that were never archived.
+
+    Under --persist-pdfs matching/none a live run analyses PDFs it does not
+    keep, so a replay cannot read them again; reusing what the live run
+    stored makes the replay produce the same notices instead of empty ones.
+    """
+    global _recorded
+    with _recorded_lock:
+        if _recorded is None:
+            history = load_history(columns=["url"] + ANALYSIS_FIELDS)
+            _recorded = {row["url"]: row for row in history.to_dict("records") if row["url"]}
+    return _recorded.get(url)
 
 def parse_date(date_text):
     """Parse date text in various formats to datetime object.
@@ -132,65 +202,136 @@ def parse_date(date_text):
     print(f"⚠️ Could not parse date: '{date_text}'")
     return None
 
-def fetch_bis_federal_register_notices():
+BIS_LISTING_URL = "https://www.bis.gov/news-updates/federal-register-notices"
+
+def notice_from_cells(pub_date, eff_date, citation, title, pdf_link):
+    """Build a Notice from the text of one BIS listing table row."""
+    date_obj = parse_date(pub_date)
+    return Notice(
+        source="BIS Federal Register",
+        publication_date=date_obj,
+        effective_date=parse_date(eff_date),
+        citation=citation,
+        title=title,
+        url=pdf_link or "",
+        date=date_obj,
+    )
+
+NEXT_PAGE_SELECTOR = 'a[rel="next"], li.pager__item--next a'
+MAX_LISTING_PAGES = 20
+
+def listing_page_url(page):
+    """URL of a BIS listing page, newest first (page 0 is the plain listing)."""
+    return BIS_LISTING_URL if page == 0 else f"{BIS_LISTING_URL}?page={page}"
+
+def listing_soup(html):
+    try:
+        return BeautifulSoup(html, "lxml")
+    except FeatureNotFound:
+        return BeautifulSoup(html, "html.parser")
+
+def parse_listing_html(html):
+    """Parse a rendered BIS listing page into Notice records."""
+    data = []
+    for row in listing_soup(html).select("table tbody tr"):
+        cols = row.find_all("td")
+        if len(cols) < 5:
+            continue
+        a_tag = cols[5].find("a") if len(cols) > 5 else None
+        pdf_link = urljoin(BIS_LISTING_URL, a_tag.get("href", "")) if a_tag and a_tag.get("href") else ""
+        data.append(notice_from_cells(
+            cols[0].get_text(strip=True),
+            cols[1].get_text(strip=True),
+            cols[3].get_text(strip=True),
+            cols[4].get_text(strip=True),
+            pdf_link,
+        ))
+    return data
+
+def has_next_page(html):
+    return listing_soup(html).select_one(NEXT_PAGE_SELECTOR) is not None
+
+# Reads the whole listing table in the browser and returns plain rows
+# [pub_date, eff_date, citation, title, pdf_href], so the table costs one
+# WebDriver command instead of seven per row (cells, four .text, link,
+# href) in the per-cell scrape.
+LISTING_ROWS_SCRIPT = """
+return Array.from(document.querySelectorAll("table tbody tr"), function (tr) {
+    var tds = tr.querySelectorAll("td");
+    if (tds.length < 5) return null;
+    var a = tds.length > 5 ? tds[5].querySelector("a") : null;
+    return [0, 1, 3, 4].map(function (i) { return tds[i].innerText.trim(); }).concat([a ? a.href : ""]);
+}).filter(Boolean);
+"""
+
+def extract_listing_rows(driver):
+    """Pull every listing row out of the loaded page with one execute_script."""
+    return [notice_from_cells(*cells) for cells in driver.execute_script(LISTING_ROWS_SCRIPT)]
+
+def fetch_bis_federal_register_notices(known_urls=None, max_pages=MAX_LISTING_PAGES):
     """Fetch BIS Federal Register notices from the official website.
     
+    Listing pages are walked newest first until a page contains a notice
+    whose URL is in known_urls, the pager ends, or max_pages is reached, so
+    a normal run reads one page and a run after downtime catches up. With
+    no known notices only the first page is read (use backfill for history).
+
+    Pages recorded within their TTL (or any recording, in replay mode) are
+    parsed from the HTTP cache; Chrome is only started for the others.
+
     Returns:
-        List of dictionaries with notice information
+        List of Notice records
     """
     print("Fetching BIS Federal Register notices...")
-    driver = setup_driver()
-    
-    try:
-        driver.get("https://www.bis.gov/news-updates/federal-register-notices")
-        
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr"))
-        )
-        rows = driver.find_elements(By.CSS_SELECTOR, "table tbody tr")
-
-        data = []
-
-        for row in rows:
-            cols = row.find_elements(By.TAG_NAME, "td")
-            if len(cols) < 5:
-                continue
-
-            pub_date = cols[0].text.strip()
-            date_obj = parse_date(pub_date)
-            eff_date = cols[1].text.strip()
-            citation = cols[3].text.strip()
-            title = cols[4].text.strip()
-
-            pdf_link = ""
-            try:
-                a_tag = cols[5].find_element(By.TAG_NAME, "a")
-                pdf_link = a_tag.get_attribute("href") if a_tag else ""
-            except:
-                pass
-
-            data.append({
-                "source": "BIS Federal Register",
-                "publication_date": pub_date,
-                "effective_date": eff_date,
-                "citation": citation,
-                "title": title,
-                "url": pdf_link,
-                "date": date_obj,
-                "pdf_downloaded": False,
-                "pdf_path": None
-            })
+    known_urls = set(known_urls or ())
+    if not known_urls:
+        max_pages = 1
 
+    driver = None
+    data = []
+    try:
+        for page in range(max_pages):
+            url = listing_page_url(page)
+            cached = http_cache.lookup(url)
+            if cached is not None:
+                print(f"♻️ Using cached BIS listing page {page + 1}")
+                notices, has_next = parse_listing_html(cached.text), has_next_page(cached.text)
+            elif http_cache.MODE == "replay":
+                if page == 0:
+                    raise http_cache.CacheMiss(f"{url} not recorded (replay mode)")
+                break
+            else:
+                if driver is None:
+                    driver = setup_driver()
+                with rate_limit.slot(url):
+                    driver.get(url)
+                try:
+                    WebDriverWait(driver, 15).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr"))
+                    )
+                except TimeoutException:
+                    if page == 0:
+                        raise
+                    break
+                html = driver.page_source
+                http_cache.store(url, html, {"Content-Type": "text/html"})
+                notices, has_next = extract_listing_rows(driver), has_next_page(html)
+
+            metrics.incr("listing.pages")
+            data.extend(notices)
+            if any(n.url in known_urls for n in notices):
+                print(f"⏹️ Reached already-stored notices on listing page {page + 1}")
+                break
+            if not notices or not has_next:
+                break
+        else:
+            if max_pages > 1:
+                print(f"⚠️ Stopped after {max_pages} listing pages without reaching a stored notice")
         return data
-    
-    finally:
-        driver.quit()
 
-def get_current_quarter():
-    """Return current quarter string, e.g., '2024_Q2'"""
-    month = datetime.now().month
-    quarter = (month - 1) // 3 + 1
-    return f"{datetime.now().year}_Q{quarter}"
+    finally:
+        if driver is not None:
+            driver.quit()
 
 def format_worksheet(writer, sheet_name, df, bold_header=True, autofit=True, row_style=True):
     worksheet = writer.sheets[sheet_name]
@@ -222,32 +363,82 @@ def format_worksheet(writer, sheet_name, df, bold_header=True, autofit=True, row
         worksheet.set_row(0, 42, header_format)
     if autofit:
         for idx, col in enumerate(df.columns):
-            max_len = max(df[col].astype(str).map(len).max(), len(col)) + 2
+            max_len = max(max((len(str(v)) for v in df[col]), default=0), len(col)) + 2
             worksheet.set_column(idx, idx, max_len)
     if row_style:
         for row in range(1, len(df) + 1):
             worksheet.set_row(row, 21, cell_format)
 
 def append_to_master(new_df, processed_dir="data/processed"):
-    """Append new data to master file and create formatted Excel report."""
-    os.makedirs(processed_dir, exist_ok=True)
+    """Append new data to the quarter partitions.
 
-    quarter_label = get_current_quarter()
-    master_csv_path = os.path.join(processed_dir, f"BIS_master_{quarter_label}.csv")
-    master_excel_path = os.path.join(processed_dir, f"BIS_master_{quarter_label}.xlsx")
+    Notices are filed under BIS_master_<year>_Q<n> by their publication date,
+    so a March notice fetched in April still lands in Q1. Only the rows that
+    were actually inserted are folded into the materialized aggregates.
+    Workbooks are written separately by write_reports.
 
+    Returns:
+        Labels of the partitions written
+    """
     try:
-        if os.path.exists(master_csv_path):
-            old_df = pd.read_csv(master_csv_path)
-            combined_df = pd.concat([old_df, new_df]).drop_duplicates(subset=["url"])
-        else:
-            combined_df = new_df
-
-        combined_df.to_csv(master_csv_path, index=False)
+        touched, inserted_df = write_partitions(new_df, processed_dir)
     except Exception as e:
         print(f"❌ Error processing master CSV: {e}")
-        return
+        return []
+
+    update_aggregates(inserted_df, processed_dir)
+    print(f"🧮 Aggregates updated with {len(inserted_df)} new notices")
+    for label in touched:
+        print(f"📌 Master updated → {partition_path(label, processed_dir)}")
+    return list(touched)
+
+REPORT_MANIFEST = "data/state/pipeline/reports.json"
+
+def report_code_version():
+    return code_version(write_master_workbook, format_worksheet, to_excel_frame)
+
+def write_reports(processed_dir="data/processed", manifest_path=REPORT_MANIFEST):
+    """Write the Excel workbook of every partition whose inputs changed.
 
+    A workbook depends on its partition CSV, that quarter's slice of the
+    aggregates and the report code, so a new notice rewrites one workbook
+    and a formatting change rewrites them all.
+
+    Returns:
+        Labels of the workbooks written
+    """
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        manifest = {}
+
+    aggregates = load_aggregates()
+    if aggregates is None:
+        aggregates = update_aggregates(notices_to_frame([]), processed_dir)
+    code = report_code_version()
+    written = []
+    for label, start, end, master_csv_path in list_partitions(processed_dir):
+        master_excel_path = os.path.splitext(master_csv_path)[0] + ".xlsx"
+        key = digest({
+            "csv": file_digest(master_csv_path),
+            "code": code,
+            "eccns": eccn_summary(aggregates, start, end).to_dict("records") if label else None,
+            "keywords": keyword_summary(aggregates, label or "undated").to_dict("records"),
+        })
+        if manifest.get(master_excel_path) == key and os.path.exists(master_excel_path):
+            continue
+        write_master_workbook(read_notices_csv(master_csv_path), aggregates, label, master_excel_path)
+        manifest[master_excel_path] = key
+        written.append(label)
+
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    return written
+
+def write_master_workbook(combined_df, aggregates, label, master_excel_path):
+    """Write the formatted Excel report for one master partition."""
     flagged_df = combined_df[combined_df["flagged"] == True].copy()
     pdf_summary_df = combined_df[["title", "date", "url"]].copy()
 
@@ -262,10 +453,15 @@ def append_to_master(new_df, processed_dir="data/processed"):
     ]
     df_guidance = pd.DataFrame({"ECCN_Guidance": guidance_text})
     
-    eccn_summary = new_df.groupby("publication_date")["eccn_count"].sum().reset_index()
-    eccn_summary.columns = ["publication_date", "total_eccns"]
+    if label is None:
+        eccn_summary_df = eccn_summary(aggregates).iloc[0:0]
+    else:
+        eccn_summary_df = eccn_summary(aggregates, *quarter_bounds(*map(int, label.split("_Q"))))
+    keyword_df = keyword_summary(aggregates, label or "undated")
     
     try:
+        combined_df = to_excel_frame(combined_df)
+        flagged_df = to_excel_frame(flagged_df)
         with pd.ExcelWriter(master_excel_path, engine="xlsxwriter") as writer:
             combined_df.to_excel(writer, sheet_name="all_entries", index=False)
             format_worksheet(writer, "all_entries", combined_df)
@@ -282,14 +478,21 @@ def append_to_master(new_df, processed_dir="data/processed"):
             df_guidance.to_excel(writer, sheet_name="ECCN_Guidance", index=False)
             format_worksheet(writer, "ECCN_Guidance", df_guidance, row_style=False)
 
-            eccn_summary.to_excel(writer, sheet_name="eccn_summary", index=False)
-            format_worksheet(writer, "eccn_summary", eccn_summary)
+            eccn_summary_df.to_excel(writer, sheet_name="eccn_summary", index=False)
+            format_worksheet(writer, "eccn_summary", eccn_summary_df)
+
+            keyword_df.to_excel(writer, sheet_name="flag_summary", index=False)
+            format_worksheet(writer, "flag_summary", keyword_df)
 
-        print(f"📌 Master updated → {master_csv_path}")
         print(f"📊 Excel export complete → {master_excel_path} with clickable links and ECCN guidance tab.")
     except Exception as e:
         print(f"❌ Error writing Excel file: {e}")
 
+FLAG_KEYWORDS = ["Entity List", "Final Rule", "Huawei", "SMIC", "military end use", "PRC"]
+
+def find_keywords(text):
+    return [kw for kw in FLAG_KEYWORDS if kw.lower() in str(text).lower()]
+
 def apply_keyword_flags(df):
     """Flag rows containing specific keywords.
     
@@ -299,110 +502,447 @@ def apply_keyword_flags(df):
     Returns:
         DataFrame with added flagged_keywords and flagged columns
     """
-    keywords = ["Entity List", "Final Rule", "Huawei", "SMIC", "military end use", "PRC"]
-    
-    def find_keywords(text):
-        matches = [kw for kw in keywords if kw.lower() in str(text).lower()]
-        return matches
-
     df["flagged_keywords"] = df["title"].apply(find_keywords)
     df["flagged"] = df["flagged_keywords"].apply(lambda x: bool(x))
     return df
 
-def main():
+def match_watchlists(item, watchlists, pages=()):
+    """Record which watched terms appear in a notice's title and page text."""
+    if watchlists is None or not len(watchlists):
+        return
+    with metrics.timer("watchlist.scan"):
+        item.watch_terms = watchlists.scan([item.title] + [text for _, text in pages])
+
+def notice_matches(item):
+    """Whether a processed notice is worth archiving under --persist-pdfs matching."""
+    return bool(item.eccns_found or item.watch_terms or find_keywords(item.title))
+
+def process_notice(item, full_extract=False, watchlists=None, near_dups=None, persist="all"):
+    """Download a notice's PDF and fill in the references found in its text.
+
+    The PDF is analysed straight from the download buffer. Only the
+    regulatory-text pages of a rule are extracted and scanned unless
+    full_extract is set. With a WatchlistIndex, the same text is scanned
+    once more for every team's watched terms; with a NearDuplicateIndex,
+    canonical_url is set to the earlier record this notice duplicates (or
+    to its own URL).
+
+    persist decides which new PDFs go to the blob store: "all" (written
+    by a background writer while the text is analysed), "matching" (only
+    notices with ECCNs, watched terms or flag keywords) or "none".
+    """
+    url = item.url
+    if not (url and url.endswith(".pdf")):
+        print(f"⚠️ No valid PDF URL for {item.title or 'unknown'}: {url}")
+        match_watchlists(item, watchlists)
+        return item
+
+    started = time.perf_counter()
+    with metrics.timer("pdf.download"):
+        sha, data, fresh = fetch_pdf(url)
+    item.pdf_downloaded = bool(sha)
+    item.pdf_sha256 = sha or ""
+    pdf_path = pdf_store.blob_path(sha) or url
+    if not sha and http_cache.MODE == "replay" and (stored := recorded_analysis(url)) is not None:
+        for field in ANALYSIS_FIELDS:
+            setattr(item, field, stored[field])
+        item.pdf_path = pdf_store.blob_path(item.pdf_sha256) or ""
+        metrics.incr("pdf.replayed_from_history")
+        metrics.incr("notices.processed")
+        print(f"♻️ PDF not archived, reusing the stored analysis: {url}")
+        return item
+    pending = pdf_store.put_bytes_async(data, url) if fresh and persist == "all" else None
+
+    try:
+        pages = []
+        if sha:
+            try:
+                with metrics.timer("pdf.extract"):
+                    pages, page_count, preamble_eccns = extract_relevant_pages(data, full=full_extract)
+                metrics.incr("pdf.pages_total", page_count)
+                metrics.incr("pdf.pages_extracted", len(pages))
+            
+                if not any(text.strip() for _, text in pages):
+                    print(f"⚠️ No text extracted from {pdf_path}")
+            
+                with metrics.timer("pdf.scan"):
+                    for field, values in hits_to_fields(scan_page_items(pages)).items():
+                        setattr(item, field, values)
+                item.eccns_found = sorted(set(item.eccns_found) | set(preamble_eccns))
+            
+                item.contains_eccn = bool(item.eccns_found)
+                item.eccn_count = len(item.eccns_found)
+            
+                print(f"📄 Processed {pdf_path} ({len(pages)}/{page_count} pages): {item.eccn_count} ECCNs found ({', '.join(item.eccns_found)})")
+            except Exception as e:
+                print(f"❌ Failed to extract ECCNs from {pdf_path}: {e}")
+                metrics.incr("pdf.errors")
+
+        match_watchlists(item, watchlists, pages)
+        if near_dups is not None and pages:
+            with metrics.timer("dedup.link"):
+                item.canonical_url, _ = near_dups.link(url, "\n".join([item.title] + [text for _, text in pages]))
+
+        if fresh and persist == "matching" and notice_matches(item):
+            pending = pdf_store.put_bytes_async(data, url)
+    finally:
+        # data may be this thread's download buffer, reused by its next
+        # fetch_pdf, so the write must finish even if the analysis failed
+        if pending is not None:
+            with metrics.timer("pdf.persist_wait"):
+                pending.result()
+    if pending is not None:
+        print(f"✅ PDF saved: {url} → {sha[:12]}")
+    elif fresh:
+        metrics.incr("pdf.not_persisted")
+    item.pdf_path = pdf_store.blob_path(sha) or ""
+
+    metrics.observe("notice.latency", time.perf_counter() - started)
+    metrics.incr("notices.processed")
+    return item
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Track BIS Federal Register notices.")
+    parser.add_argument("--replay", action="store_true",
+                        help="serve every fetch from recorded HTTP responses; never touch the network")
+    parser.add_argument("--full-extract", action="store_true",
+                        help="extract and scan every PDF page instead of only the regulatory text")
+    parser.add_argument("--persist-pdfs", choices=PERSIST_MODES, default="all",
+                        help="which downloaded PDFs to archive in data/blobs; analysis always runs from memory")
+    parser.add_argument("--max-pages", type=int, default=MAX_LISTING_PAGES,
+                        help="most listing pages to walk when catching up (default %(default)s)")
+    parser.add_argument("--explain", action="store_true",
+                        help="show which pipeline stages run and why, and which are reused from cache")
+    parser.add_argument("--profile", action="store_true",
+                        help="record per-stage memory peaks and a sampling CPU profile under data/metrics/")
+    parser.add_argument("--memory-budget", type=float, metavar="MB",
+                        help="RSS budget in MiB; over it stages spill outputs to disk and use smaller batches")
+    parser.add_argument("--queue", action="store_true",
+                        help="hand each notice to `regulus.py worker` processes through the job queue")
+    parser.add_argument("--queue-path", default=QUEUE_PATH, help="job queue database (default %(default)s)")
+    parser.add_argument("--queue-timeout", type=float, default=None,
+                        help="give up waiting for workers after this many seconds")
+    sub = parser.add_subparsers(dest="command")
+    backfill = sub.add_parser("backfill", help="process historical BIS notices from the Federal Register API")
+    backfill.add_argument("--from", dest="from_date", required=True, type=date.fromisoformat,
+                          help="first publication date, e.g. 2018-01-01")
+    backfill.add_argument("--to", dest="to_date", type=date.fromisoformat, help="last publication date (default today)")
+    backfill.add_argument("--workers", type=int, default=8, help="parallel downloads/extractions")
+    backfill.add_argument("--batch-size", type=int, default=50, help="notices merged and checkpointed together")
+    worker = sub.add_parser("worker", help="claim and process notice jobs from the job queue")
+    worker.add_argument("--idle-exit", type=float, default=None,
+                        help="exit after this many seconds without a job (default: run forever)")
+    worker.add_argument("--visibility-timeout", type=float, default=VISIBILITY_TIMEOUT,
+                        help="seconds a claimed job stays leased before other workers may retry it")
+    return parser.parse_args(argv)
+
+def stored_urls():
+    """URLs of the notices stored in the last year, enough to recognise the listing's known notices."""
+    recent = load_history(start=pd.Timestamp.now() - pd.DateOffset(years=1), columns=["url"])
+    return set(recent["url"])
+
+def fetch_stage(max_pages=MAX_LISTING_PAGES):
+    return notices_to_frame(fetch_bis_federal_register_notices(stored_urls(), max_pages))
+
+def process_stage(fetched_df, full_extract=False, persist="all"):
+    """Download, extract and scan every fetched notice, most urgent first.
+
+    Notices are ordered by their title score (see scraper.scheduler),
+    after any already stored, and an alert is written as soon as each
+    new high-priority or watched notice completes; detection latency is
+    recorded for new notices only. The returned frame keeps listing
+    order. Over the memory budget, --full-extract falls back to the
+    regulatory-text pages for the remaining notices.
+    """
+    watchlist_index = load_watchlists()
+    near_dups = NearDuplicateIndex.load()
+    alerted = scheduler.load_alerted()
+    known = stored_urls()
+    notices = frame_to_notices(fetched_df)
+    for priority, item in scheduler.in_priority_order(notices, watchlist_index, known):
+        if full_extract and profiling.over_budget("process"):
+            full_extract = False
+        process_notice(item, full_extract=full_extract, watchlists=watchlist_index, near_dups=near_dups, persist=persist)
+        if item.url not in known:
+            scheduler.record_detection(item, priority, alerted)
+    near_dups.save()
+    return notices_to_frame(notices)
+
+JOB_KIND = "process_notice"
+
+def queue_process_stage(fetched_df, full_extract=False, queue_path=QUEUE_PATH, timeout=None, persist="all"):
+    """process_stage spread across `regulus.py worker` processes.
+
+    Each fetched notice becomes one job; workers download, extract and
+    scan it and hand back the filled-in Notice plus its MinHash signature.
+    Jobs are enqueued (and so claimed) in priority order, and workers
+    write alerts as they finish them. Near-duplicates are linked here so
+    the index has a single writer. A notice whose job fails on every
+    attempt is kept as fetched.
+    """
+    queue = JobQueue(queue_path)
+    batch = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    notices = frame_to_notices(fetched_df)
+    positions = {id(item): position for position, item in enumerate(notices)}
+    known = stored_urls()
+    for priority, item in scheduler.in_priority_order(notices, load_watchlists(), known):
+        queue.enqueue(batch, JOB_KIND, str(positions[id(item)]), {
+            "notice": item.to_dict(), "full_extract": full_extract, "persist": persist, "priority": priority,
+            "known": item.url in known,
+        })
+    print(f"📬 Queued {len(notices)} notices as batch {batch} → {queue_path}")
+
+    last = {}
+    def progress(counts):
+        if counts != last:
+            print(f"⏳ Batch {batch}: {counts['done']} done, {counts['leased']} in progress, "
+                  f"{counts['queued']} queued, {counts['failed']} failed")
+            last.update(counts)
+    with metrics.timer("queue.wait"):
+        queue.wait(batch, timeout=timeout, progress=progress)
+
+    near_dups = NearDuplicateIndex.load()
+    results = {int(key): (result, error) for key, result, error in queue.results(batch)}
+    rows = []
+    for position, item in enumerate(notices):
+        result, error = results[position]
+        if result is None:
+            print(f"❌ Giving up on {item.url or item.title}: {error}")
+            metrics.incr("queue.failed")
+            rows.append(item.to_dict())
+            continue
+        row = result["notice"]
+        if result["signature"] is not None:
+            row["canonical_url"], _ = near_dups.link_signature(row["url"], result["signature"])
+        rows.append(row)
+    near_dups.save()
+    queue.close()
+    return coerce_notices(pd.DataFrame(rows, columns=NOTICE_COLUMNS))
+
+def run_worker(queue_path=QUEUE_PATH, idle_exit=None, visibility_timeout=VISIBILITY_TIMEOUT, poll_interval=1.0):
+    """Claim notice jobs from the queue and process them until idle.
+
+    Any number of workers, on this host or others sharing the data
+    directory, can run at once; a job whose worker dies is retried by
+    another once its lease lapses.
+
+    Returns:
+        Number of jobs completed
+    """
+    queue = JobQueue(queue_path)
+    owner = worker_id()
+    watchlist_digest = file_digest(WATCHLISTS_PATH)
+    watchlist_index = load_watchlists()
+    alerted = scheduler.load_alerted()
+    completed = 0
+    idle_since = time.monotonic()
+    print(f"👷 Worker {owner} waiting for jobs in {queue_path}")
+    while True:
+        job = queue.claim(owner, visibility_timeout, kinds=[JOB_KIND])
+        if job is None:
+            if idle_exit is not None and time.monotonic() - idle_since > idle_exit:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        if file_digest(WATCHLISTS_PATH) != watchlist_digest:
+            watchlist_digest, watchlist_index = file_digest(WATCHLISTS_PATH), load_watchlists()
+        recorder = SignatureRecorder()
+        try:
+            item = frame_to_notices(pd.DataFrame([job.payload["notice"]]))[0]
+            process_notice(item, job.payload["full_extract"], watchlist_index, recorder, job.payload.get("persist", "all"))
+            if not job.payload.get("known"):
+                scheduler.record_detection(item, job.payload.get("priority", 0), alerted)
+            signature = recorder.signatures.get(item.url)
+            queue.complete(job, {
+                "notice": item.to_dict(),
+                "signature": signature.tolist() if signature is not None else None,
+            }, owner)
+            completed += 1
+            metrics.incr("queue.completed")
+        except Exception as e:
+            print(f"❌ Job {job.id} failed (attempt {job.attempts}): {e}")
+            metrics.incr("queue.retried")
+            queue.fail(job, e, owner)
+        idle_since = time.monotonic()
+
+    queue.close()
+    print(f"👷 Worker {owner} done: {completed} jobs")
+    return completed
+
+def flag_stage(df):
+    df = apply_keyword_flags(df.copy())
+    if df["date"].notnull().any():
+        df = df.sort_values(by="date", ascending=False)
+    return df
+
+def latest_export(raw_dir="data/raw"):
+    exports = sorted(name for name in os.listdir(raw_dir) if name.startswith("export_updates_"))
+    return os.path.join(raw_dir, exports[-1]) if exports else None
+
+def changes_stage(df):
+    """Write the Markdown and email digest of changes since the previous export.
+
+    Runs before the export stage, so the newest export is still the
+    previous run's. Both exports only cover the newest listing pages, so a
+    previous notice counts as removed only if it is newer than the oldest
+    notice fetched now; older ones merely scrolled off the listing.
+    """
+    previous = latest_export()
+    oldest = df["publication_date"].fillna(df["date"]).min()
+    timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M')
+    markdown_path = os.path.join(REPORTS_DIR, f"changes_{timestamp}.md")
+    counts = write_change_report(
+        iter_changes(previous if previous else df.iloc[0:0], df, removed_after=oldest),
+        markdown_path, os.path.join(REPORTS_DIR, f"changes_{timestamp}.txt"),
+        title=f"BIS regulatory changes, {datetime.now():%Y-%m-%d}",
+    )
+    print(f"📝 Change report: {counts['added']} added, {counts['removed']} removed, "
+          f"{counts['modified']} modified → {markdown_path}")
+
+def export_stage(df):
+    """Write this run's notices to data/raw/export_updates_<timestamp>.csv."""
+    timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M')
+    output_file = f"data/raw/export_updates_{timestamp}.csv"
+    write_notices_csv(df, output_file, encoding="utf-8")
+    print(f"\nData saved to {output_file}")
+
+def master_stage(df):
+    """Store new notices: duplicate links, master partitions, ECCN feed, citation graph and watchlists."""
+    master_df, new_links = write_duplicate_links(df, NearDuplicateIndex.load())
+    if new_links:
+        print(f"🔗 {new_links} near-duplicates linked to existing records → {DUPLICATE_LINKS_PATH}")
+
+    touched = append_to_master(master_df)
+    pdf_store.compress_cold()
+
+    eccn_changes = update_eccn_feed(master_df)
+    for change in eccn_changes.itertuples(index=False):
+        print(f"🔔 ECCN {change.eccn} ({change.change}): {change.rules_before} → {change.rules_after} rules, first seen {change.first_seen}")
+
+    linked = update_citation_graph(master_df)
+    if linked:
+        print(f"🕸️ {linked} notices added to the citation graph → {CITATION_GRAPH_PATH}")
+
+    for name, rows in write_subscription_results(master_df, load_watchlists()).items():
+        print(f"🔔 Watchlist {name}: {len(rows)} new notices → {WATCHLIST_RESULTS_DIR}/{name}.csv")
+    # Digests rather than labels: a second run into the same quarter must
+    # still change this output, or the report stage is wrongly skipped
+    return {
+        "partitions": {label or "undated": file_digest(partition_path(label)) for label in touched},
+        "aggregates": file_digest(aggregates.AGGREGATES_PATH),
+    }
+
+def report_stage(master_result):
+    for label in write_reports():
+        print(f"📊 Report written for {label or 'undated'}")
+    written, removed = build_site()
+    print(f"🌐 Site: {written} pages written, {removed} removed → {SITE_DIR}/index.html")
+
+def missing_reports(processed_dir="data/processed"):
+    return sorted(
+        path for _, _, _, path in list_partitions(processed_dir)
+        if not os.path.exists(os.path.splitext(path)[0] + ".xlsx")
+    )
+
+def build_pipeline(args):
+    """The daily run as a DAG of memoized stages.
+
+    fetch always runs; every other stage is skipped when its inputs, code
+    and config hash the same as last time, so an unchanged listing costs
+    one fetch, a new keyword list re-runs flagging onwards, and a change
+    to the workbook layout re-runs only the report stage. With --queue
+    the process stage hands notices to queue workers instead.
+    """
+    if args.queue:
+        process = lambda fetched: queue_process_stage(
+            fetched, args.full_extract, args.queue_path, args.queue_timeout, args.persist_pdfs)
+    else:
+        process = lambda fetched: process_stage(fetched, args.full_extract, args.persist_pdfs)
+    return Pipeline([
+        Stage("fetch", lambda: fetch_stage(args.max_pages), volatile=True),
+        Stage("process", process, inputs=["fetch"],
+              code=[process_stage, queue_process_stage, process_notice, notice_matches, match_watchlists, fetch_pdf, extractors, sections, near_dup, watchlists, scheduler],
+              config=lambda: {"full_extract": args.full_extract, "persist": args.persist_pdfs,
+                              "watchlists": file_digest(WATCHLISTS_PATH)}),
+        Stage("flag", flag_stage, inputs=["process"], code=[flag_stage, apply_keyword_flags, find_keywords],
+              config=lambda: FLAG_KEYWORDS),
+        # changes must run before export: it diffs against the newest export on disk
+        Stage("changes", changes_stage, inputs=["flag"], code=[changes_stage, change_tracker], output=None),
+        Stage("export", export_stage, inputs=["flag"], code=[export_stage], output=None),
+        Stage("master", master_stage, inputs=["flag"],
+              code=[master_stage, append_to_master, write_partitions, aggregates, eccn_feed, citation_graph, watchlists],
+              config=lambda: {"watchlists": file_digest(WATCHLISTS_PATH)}, output="json"),
+        Stage("report", report_stage, inputs=["master"],
+              code=[report_stage, write_reports, write_master_workbook, format_worksheet, site],
+              config=lambda: {"missing": missing_reports(), "site": os.path.exists(os.path.join(SITE_DIR, "index.html"))},
+              output=None),
+    ], explain=args.explain)
+
+def main(argv=None):
     """Main function to execute the web scraping and report generation."""
+    args = parse_args(argv)
+    if args.replay:
+        http_cache.set_mode("replay")
+
     try:
         os.makedirs("data/raw", exist_ok=True)
-        os.makedirs("data/pdfs", exist_ok=True)
+        os.makedirs("data/blobs", exist_ok=True)
     except OSError as e:
         print(f"❌ Error creating directories: {e}")
         return
 
-    bis_data = fetch_bis_federal_register_notices()
-    
-    for item in bis_data:
-        item["contains_eccn"] = False
-        item["eccn_count"] = 0
-        item["eccns_found"] = ""
-
-        url = item.get("url")
-        if url and url.endswith(".pdf"):
-            pdf_path = download_pdf(url)
-            item["pdf_downloaded"] = bool(pdf_path)
-            item["pdf_path"] = pdf_path or ""
-
-            if pdf_path:
-                try:
-                    with fitz.open(pdf_path) as doc:
-                        pdf_text = ""
-                        for page in doc:
-                            pdf_text += page.get_text()
-                    
-                    if not pdf_text.strip():
-                        print(f"⚠️ No text extracted from {pdf_path}")
-                    
-                    eccn_pattern = r'\b[0-9][A-Z][0-9]{3}(?:\.[a-z0-9]+)?\b'
-                    eccn_matches = re.findall(eccn_pattern, pdf_text, flags=re.IGNORECASE)
-                    unique_eccns = sorted(set(eccn_matches))
-                    
-                    item["contains_eccn"] = bool(unique_eccns)
-                    item["eccn_count"] = len(unique_eccns)
-                    item["eccns_found"] = ", ".join(unique_eccns)
-                    
-                    print(f"📄 Processed {pdf_path}: {len(unique_eccns)} ECCNs found ({item['eccns_found']})")
-                except Exception as e:
-                    print(f"❌ Failed to extract ECCNs from {pdf_path}: {e}")
-        else:
-            print(f"⚠️ No valid PDF URL for {item.get('title', 'unknown')}: {url}")
-
+    metrics.reset()
+    profiling.set_memory_budget(args.memory_budget)
+    if args.profile:
+        profiling.start_profiling()
     try:
-        df = pd.DataFrame(bis_data)
-        df = apply_keyword_flags(df)
-    except Exception as e:
-        print(f"❌ Error creating DataFrame: {e}")
+        run(args)
+    finally:
+        profile_path = profiling.stop_profiling()
+        if profile_path:
+            print(f"🔬 Profile → {profile_path} (+ .folded stacks)")
+
+def run(args):
+    """Run the worker, backfill or daily pipeline chosen on the command line."""
+    memory = {"peak_rss_mb": round(profiling.peak_rss_mb(), 1), "budget_mb": args.memory_budget}
+    if args.command == "worker":
+        completed = run_worker(args.queue_path, args.idle_exit, args.visibility_timeout)
+        memory["peak_rss_mb"] = round(profiling.peak_rss_mb(), 1)
+        metrics.write_run_metrics(extra={"worker": {"id": worker_id(), "completed": completed}, "memory": memory},
+                                  name=f"worker_{os.getpid()}")
         return
 
-    output_dir = "data/raw"
-    try:
-        previous_files = sorted(
-            [f for f in os.listdir(output_dir) if f.startswith("export_updates_")],
-            reverse=True
-        )
-        if previous_files:
-            prev_path = os.path.join(output_dir, previous_files[0])
-            prev_df = pd.read_csv(prev_path)
-            if df.equals(prev_df):
-                print("No new data found since last run.")
-                return
-    except Exception as e:
-        print(f"❌ Error comparing with previous data: {e}")
+    if args.command == "backfill":
+        result = run_backfill(args.from_date, args.to_date, args.workers, args.batch_size, args.full_extract,
+                              persist=args.persist_pdfs)
+        write_reports()
+        build_site()
+        memory["peak_rss_mb"] = round(profiling.peak_rss_mb(), 1)
+        metrics_path = metrics.write_run_metrics(
+            extra={"backfill": result, "rate_limits": rate_limit.snapshot(), "memory": memory})
+        print(f"⏱️ Backfill metrics → {metrics_path}")
+        return
 
-    if "date" in df.columns and df["date"].notnull().any():
-        df.sort_values(by="date", ascending=False, inplace=True)
+    pipeline = build_pipeline(args)
+    pipeline.run()
+    df = pipeline.output("flag")
+    if not pipeline.ran["master"]:
+        print("No new data found since last run.")
 
-    try:
-        timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M')
-        output_file = f"data/raw/export_updates_{timestamp}.csv"
-        df.to_csv(output_file, index=False, encoding="utf-8")
-    except Exception as e:
-        print(f"❌ Error saving CSV: {e}")
-        return
-    
-    append_to_master(df)
-    
-    print(f"\nData saved to {output_file}")
     print("\nFirst 5 entries:")
     print(df.head())
     
     print(f"\nSummary:")
-    print(f"BIS Federal Register notices: {len(bis_data)}")
+    print(f"BIS Federal Register notices: {len(pipeline.output('fetch'))}")
     print(f"Total entries: {len(df)}")
-    
-    pdfs_downloaded = sum(1 for item in bis_data if item.get("pdf_downloaded", False))
-    print(f"PDFs downloaded: {pdfs_downloaded}")
-    
-    flagged_count = df["flagged"].sum()
-    print(f"Flagged items: {flagged_count}")
+    print(f"PDFs downloaded: {int(df['pdf_downloaded'].sum())}")
+    print(f"Flagged items: {int(df['flagged'].sum())}")
+
+    memory["peak_rss_mb"] = round(profiling.peak_rss_mb(), 1)
+    metrics_path = metrics.write_run_metrics(
+        extra={"rate_limits": rate_limit.snapshot(), "pipeline": pipeline.ran, "memory": memory})
+    print(f"⏱️ Run metrics → {metrics_path}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,113 @@
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+from scraper.history import load_history, quarter_label
+from scraper.schema import parse_list
+
+AGGREGATES_PATH = "data/state/aggregates.json"
+
+
+def empty_aggregates():
+    return {
+        "notices_by_date": {},
+        "flagged_by_date": {},
+        "eccns_by_date": {},
+        "flagged_by_keyword": {},
+        "flagged_by_quarter_keyword": {},
+        "notices_by_source_month": {},
+    }
+
+
+def load_aggregates(path=AGGREGATES_PATH):
+    """Load the materialized aggregate table, or None if it was never built."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_aggregates(aggregates, path=AGGREGATES_PATH):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(aggregates, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _bump(table, key, amount):
+    table[key] = table.get(key, 0) + amount
+
+
+def fold(aggregates, df):
+    """Add the notices in df to the aggregate counters in place."""
+    for row in df.itertuples(index=False):
+        day = row.publication_date if pd.notna(row.publication_date) else row.date
+        day_key = day.strftime("%Y-%m-%d") if pd.notna(day) else "undated"
+        month_key = day.strftime("%Y-%m") if pd.notna(day) else "undated"
+
+        _bump(aggregates["notices_by_date"], day_key, 1)
+        _bump(aggregates["eccns_by_date"], day_key, int(row.eccn_count))
+        if row.flagged:
+            _bump(aggregates["flagged_by_date"], day_key, 1)
+        quarter_key = quarter_label(day) if pd.notna(day) else "undated"
+        for keyword in parse_list(row.flagged_keywords):
+            _bump(aggregates["flagged_by_keyword"], keyword, 1)
+            _bump(aggregates["flagged_by_quarter_keyword"].setdefault(quarter_key, {}), keyword, 1)
+        _bump(aggregates["notices_by_source_month"].setdefault(str(row.source), {}), month_key, 1)
+    return aggregates
+
+
+def rebuild_aggregates(processed_dir="data/processed", path=AGGREGATES_PATH):
+    """Recompute the table from the full history (one-off bootstrap or repair)."""
+    aggregates = fold(empty_aggregates(), load_history(processed_dir=processed_dir))
+    save_aggregates(aggregates, path)
+    return aggregates
+
+
+def update_aggregates(inserted_df, processed_dir="data/processed", path=AGGREGATES_PATH):
+    """Fold the notices a run actually inserted into the master into the table.
+
+    Cost depends only on the size of the delta. The first call after an
+    upgrade (or after a new counter is added) bootstraps from history,
+    which already contains the delta.
+    """
+    aggregates = load_aggregates(path)
+    if aggregates is None or set(empty_aggregates()) - set(aggregates):
+        return rebuild_aggregates(processed_dir, path)
+    fold(aggregates, inserted_df)
+    save_aggregates(aggregates, path)
+    return aggregates
+
+
+def eccn_summary(aggregates, start=None, end=None):
+    """ECCNs per publication date (optionally within [start, end]) as a DataFrame."""
+    rows = [
+        (day, total) for day, total in sorted(aggregates["eccns_by_date"].items())
+        if day != "undated"
+        and (start is None or day >= pd.Timestamp(start).strftime("%Y-%m-%d"))
+        and (end is None or day <= pd.Timestamp(end).strftime("%Y-%m-%d"))
+    ]
+    return pd.DataFrame(rows, columns=["publication_date", "total_eccns"])
+
+
+def keyword_summary(aggregates, label=None):
+    """Flagged notices per keyword, overall or for one quarter label."""
+    counts = aggregates["flagged_by_keyword"]
+    if label is not None:
+        counts = aggregates["flagged_by_quarter_keyword"].get(label, {})
+    items = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+    return pd.DataFrame(items, columns=["keyword", "flagged_notices"])
+
+
+def source_month_summary(aggregates):
+    rows = [
+        (source, month, count)
+        for source, months in sorted(aggregates["notices_by_source_month"].items())
+        for month, count in sorted(months.items())
+    ]
+    return pd.DataFrame(rows, columns=["source", "month", "notices"])
@@ -0,0 +1,174 @@
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from urllib.parse import urlencode
+
+from scraper import http_cache, metrics, profiling
+from scraper.schema import Notice
+
+FR_API_URL = "https://www.federalregister.gov/api/v1/documents.json"
+FR_API_FIELDS = [
+    "document_number", "title", "type", "publication_date", "effective_on",
+    "citation", "pdf_url", "html_url",
+]
+CHECKPOINT_PATH = "data/state/backfill_checkpoint.json"
+
+
+def _fr_query(start, end, page, per_page=100):
+    params = [
+        ("conditions[agencies][]", "industry-and-security-bureau"),
+        ("conditions[publication_date][gte]", start.isoformat()),
+        ("conditions[publication_date][lte]", end.isoformat()),
+        ("order", "oldest"),
+        ("per_page", per_page),
+        ("page", page),
+    ] + [("fields[]", name) for name in FR_API_FIELDS]
+    return f"{FR_API_URL}?{urlencode(params)}"
+
+
+def enumerate_documents(start, end=None, per_page=100):
+    """Yield every BIS Federal Register document published in [start, end].
+
+    The API caps how deep a single query can page, so the range is walked
+    one year at a time, oldest first. Listing pages go through the HTTP
+    cache, so re-enumerating on resume costs no requests.
+    """
+    end = end or date.today()
+    for year in range(start.year, end.year + 1):
+        window_start = max(start, date(year, 1, 1))
+        window_end = min(end, date(year, 12, 31))
+        page = 1
+        while True:
+            payload = http_cache.get(_fr_query(window_start, window_end, page, per_page), timeout=30).json()
+            yield from payload.get("results", [])
+            if not payload.get("next_page_url"):
+                break
+            page += 1
+
+
+def _parse_iso(value):
+    return datetime.strptime(value, "%Y-%m-%d") if value else None
+
+
+def notice_from_document(doc):
+    """Build a Notice from one Federal Register API result."""
+    published = _parse_iso(doc.get("publication_date"))
+    return Notice(
+        source="BIS Federal Register",
+        publication_date=published,
+        effective_date=_parse_iso(doc.get("effective_on")),
+        citation=doc.get("citation") or "",
+        title=doc.get("title") or "",
+        url=doc.get("pdf_url") or doc.get("html_url") or "",
+        date=published,
+    )
+
+
+def load_checkpoint(path=CHECKPOINT_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except FileNotFoundError:
+        checkpoint = {"done": [], "processed": 0, "elapsed_s": 0.0}
+    checkpoint["done"] = set(checkpoint["done"])
+    return checkpoint
+
+
+def save_checkpoint(checkpoint, path=CHECKPOINT_PATH):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    payload = dict(checkpoint, done=sorted(checkpoint["done"]))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def run_backfill(start, end=None, workers=8, batch_size=50, full_extract=False,
+                 checkpoint_path=CHECKPOINT_PATH, documents=None, persist="all"):
+    """Process historical notices in parallel batches, resumably.
+
+    Each batch is downloaded and scanned by a thread pool with the same
+    process_notice used by daily runs, then flagged and merged into the
+    master partitions (near-duplicates are only linked), aggregates, ECCN
+    state, citation graph and watchlists. The checkpoint is written after
+    every batch, so an interrupted backfill resumes with the first
+    unfinished batch. A notice whose PDF could not be downloaded is
+    neither stored nor checkpointed, so the next resume retries it. Over the memory budget the batch size is halved for
+    the rest of the run, which also caps how many PDFs are held in memory
+    at once.
+
+    Args:
+        documents: optional iterable of API results to use instead of
+            querying the Federal Register API
+        persist: which PDFs to archive, as for process_notice
+
+    Returns:
+        Dict with notices processed this session, elapsed seconds and
+        throughput
+    """
+    import regulus
+    from scraper.citation_graph import update_citation_graph
+    from scraper.eccn_feed import update_eccn_feed
+    from scraper.near_dup import NearDuplicateIndex, write_duplicate_links
+    from scraper.schema import notices_to_frame
+    from scraper.watchlists import load_watchlists, write_subscription_results
+
+    checkpoint = load_checkpoint(checkpoint_path)
+    watchlists = load_watchlists()
+    near_dups = NearDuplicateIndex.load()
+    if documents is None:
+        print(f"📚 Enumerating BIS documents from {start} to {end or 'today'}...")
+        documents = enumerate_documents(start, end)
+    pending = [doc for doc in documents if doc.get("document_number") not in checkpoint["done"]]
+    print(f"📚 {len(pending)} documents to process ({len(checkpoint['done'])} already done)")
+
+    started = time.perf_counter()
+    processed = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        offset = 0
+        while offset < len(pending):
+            if batch_size > 1 and profiling.over_budget("backfill"):
+                batch_size = max(1, batch_size // 2)
+                print(f"🧠 Backfill batch size reduced to {batch_size}")
+            batch = pending[offset:offset + batch_size]
+            offset += len(batch)
+            notices = [notice_from_document(doc) for doc in batch]
+            batch_started = time.perf_counter()
+            with metrics.timer("backfill.batch"), profiling.stage("backfill.batch"):
+                list(pool.map(lambda n: regulus.process_notice(n, full_extract, watchlists, near_dups, persist), notices))
+                ok = [not (n.url.endswith(".pdf") and not n.pdf_downloaded) for n in notices]
+                df = regulus.apply_keyword_flags(notices_to_frame([n for n, stored in zip(notices, ok) if stored]))
+                df, _ = write_duplicate_links(df, near_dups)
+                regulus.append_to_master(df)
+                update_eccn_feed(df)
+                update_citation_graph(df)
+                write_subscription_results(df, watchlists)
+
+            done = [doc for doc, stored in zip(batch, ok) if stored]
+            if len(done) < len(batch):
+                metrics.incr("backfill.failed", len(batch) - len(done))
+                print(f"⚠️ {len(batch) - len(done)} PDFs failed to download; left for the next resume")
+            checkpoint["done"].update(doc["document_number"] for doc in done)
+            checkpoint["processed"] += len(done)
+            checkpoint["elapsed_s"] += time.perf_counter() - batch_started
+            near_dups.save()
+            save_checkpoint(checkpoint, checkpoint_path)
+            processed += len(batch)
+            elapsed = time.perf_counter() - started
+
+            rate = processed / elapsed if elapsed else 0.0
+            remaining = len(pending) - processed
+            eta = remaining / rate if rate else float("inf")
+            print(f"⏩ Backfill {processed}/{len(pending)} · {rate:.2f} notices/s · ETA {eta / 60:.1f} min")
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Backfill done: {checkpoint['processed']} notices in {checkpoint['elapsed_s'] / 60:.1f} min across sessions")
+    return {
+        "processed": processed,
+        "elapsed_s": elapsed,
+        "throughput_notices_per_s": processed / elapsed if elapsed else None,
+    }
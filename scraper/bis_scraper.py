@@ -1,13 +1,19 @@
-import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 from datetime import datetime
 import os
+import sys
+
+if __package__ in (None, ""):
+    # Run as `python scraper/bis_scraper.py`: make the scraper package importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper import http_cache
 
 
 def fetch_bis_news():
     url = "https://www.bis.doc.gov/index.php/all-articles/17-about-bis/newsroom"
-    response = requests.get(url)
+    response = http_cache.get(url)
     soup = BeautifulSoup(response.text, "html.parser")
     
     data = []
@@ -2,12 +2,21 @@ from requests_html import HTMLSession
 import pandas as pd
 from datetime import datetime
 import os
+import sys
+
+if __package__ in (None, ""):
+    # Run as `python scraper/bis_scraper2.py`: make the scraper package importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper import rate_limit
 
 def fetch_bis_news():
     session = HTMLSession()
     url = "https://www.bis.doc.gov/index.php/all-articles/17-about-bis/newsroom"
-    r = session.get(url)
-    r.html.render(timeout=20, args=["--no-sandbox", "--disable-setuid-sandbox"])
+    with rate_limit.slot(url) as slot:
+        r = session.get(url)
+        slot.record(r)
+        r.html.render(timeout=20, args=["--no-sandbox", "--disable-setuid-sandbox"])
 
     articles = r.html.find("div.catItemView")
     data = []
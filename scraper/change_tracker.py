@@ -1,12 +1,31 @@
+import os
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+
 import pandas as pd
 
+from scraper import metrics
+from scraper.schema import LIST_COLUMNS, coerce_notices
+
+REPORTS_DIR = "data/reports"
+
+# A notice present on both sides counts as modified if any of these differ
+COMPARED_COLUMNS = [
+    "citation", "title", "publication_date", "effective_date", "pdf_sha256", "eccns_found", "flagged_keywords",
+]
+CHUNK_ROWS = 5000
+
+
 def track_changes(file_old, file_new):
     df_old = pd.read_csv(file_old)
     df_new = pd.read_csv(file_new)
-    
+
     old_set = set(df_old["url"])
     new_set = set(df_new["url"])
-    
+
     added = new_set - old_set
     removed = old_set - new_set
 
@@ -15,3 +34,237 @@ def track_changes(file_old, file_new):
 
     return added_df, removed_df
 
+
+@dataclass(slots=True)
+class Change:
+    """One added, removed or modified notice.
+
+    record is the notice as it is now (as it was, for removals);
+    previous and fields are only set for modifications.
+    """
+    kind: str
+    record: dict
+    previous: dict | None = None
+    fields: list[str] = field(default_factory=list)
+
+
+def _chunks(source, chunksize=CHUNK_ROWS):
+    """Yield typed DataFrame chunks of a CSV path, partition directory or DataFrame."""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunksize):
+            yield coerce_notices(source.iloc[start:start + chunksize])
+        return
+    if os.path.isdir(source):
+        from scraper.history import list_partitions
+        paths = [path for _, _, _, path in list_partitions(source)]
+    else:
+        paths = [source]
+    for path in paths:
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            yield coerce_notices(chunk)
+
+
+def _comparable(row, col):
+    value = row[col]
+    if col in LIST_COLUMNS:
+        return tuple(value)
+    return None if pd.isna(value) else value
+
+
+def _key(row):
+    return hash(tuple(_comparable(row, col) for col in COMPARED_COLUMNS))
+
+
+def _rows(source, chunksize):
+    for chunk in _chunks(source, chunksize):
+        yield from chunk.to_dict("records")
+
+
+def iter_changes(old, new, chunksize=CHUNK_ROWS, removed_after=None):
+    """Yield the Changes between two snapshots of notices, keyed by URL.
+
+    old and new may be CSV paths, processed directories (all quarter
+    partitions) or DataFrames. Neither side is held in memory: the old
+    side is reduced to one hash per URL, the new side is streamed once
+    (added notices are yielded as they are read), and the old side is
+    streamed again for removals and modifications. Only modified rows
+    are buffered until their old version is read.
+
+    When new covers only a window of the history (a listing scrape), pass
+    its oldest date as removed_after: old notices dated on or before it
+    (or undated) merely fell out of the window and are not reported removed.
+    """
+    old_keys = {}
+    for row in _rows(old, chunksize):
+        old_keys[row["url"]] = _key(row)
+
+    seen, modified = set(), {}
+    for row in _rows(new, chunksize):
+        url = row["url"]
+        if url in seen:
+            continue
+        seen.add(url)
+        if url not in old_keys:
+            yield Change("added", row)
+        elif old_keys[url] != _key(row):
+            modified[url] = row
+    del old_keys
+
+    for row in _rows(old, chunksize):
+        url = row["url"]
+        if url not in seen:
+            seen.add(url)
+            if removed_after is None or _dated_after(row, removed_after):
+                yield Change("removed", row)
+        elif url in modified:
+            current = modified.pop(url)
+            fields = [col for col in COMPARED_COLUMNS if _comparable(row, col) != _comparable(current, col)]
+            yield Change("modified", current, previous=row, fields=fields)
+
+
+def _dated_after(row, cutoff):
+    date = row["publication_date"] if pd.notna(row["publication_date"]) else row["date"]
+    return pd.notna(date) and date > cutoff
+
+
+def _date(value):
+    return value.strftime("%Y-%m-%d") if isinstance(value, pd.Timestamp) and pd.notna(value) else "undated"
+
+
+def _value(value):
+    if isinstance(value, list):
+        return ", ".join(value) or "—"
+    if isinstance(value, pd.Timestamp):
+        return _date(value)
+    return str(value) if value not in ("", None) else "—"
+
+
+def _difference(col, old, new, arrow):
+    if col in LIST_COLUMNS:
+        gained = [f"+{v}" for v in new if v not in old]
+        lost = [f"−{v}" for v in old if v not in new]
+        items = gained + lost
+        return ", ".join(items[:12]) + (f" (+{len(items) - 12} more)" if len(items) > 12 else "")
+    return f"{_value(old)} {arrow} {_value(new)}"
+
+
+def _markdown_line(change):
+    record = change.record
+    title = f"[{record['title'] or record['url']}]({record['url']})" if record["url"] else record["title"]
+    parts = [f"- **{change.kind}** {_date(record['date'])} · {record['citation'] or 'no citation'} · {title}"]
+    if record["eccns_found"]:
+        parts.append(f"  - ECCNs: {', '.join(record['eccns_found'])}")
+    if record["flagged_keywords"]:
+        parts.append(f"  - Flags: {', '.join(record['flagged_keywords'])}")
+    for col in change.fields:
+        parts.append(f"  - {col}: {_difference(col, change.previous[col], record[col], '→')}")
+    return "\n".join(parts) + "\n"
+
+
+def _email_line(change):
+    record = change.record
+    lines = [f"  [{change.kind.upper()}] {_date(record['date'])}  {record['citation'] or 'no citation'}  {record['title']}",
+             f"      {record['url']}"]
+    if record["eccns_found"]:
+        lines.append(f"      ECCNs: {', '.join(record['eccns_found'])}")
+    for col in change.fields:
+        lines.append(f"      {col}: {_difference(col, change.previous[col], record[col], '->')}")
+    return "\n".join(lines) + "\n"
+
+
+def _atomic_write(path, parts):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        for part in parts:
+            if isinstance(part, str):
+                f.write(part)
+            else:
+                part.seek(0)
+                while chunk := part.read(1 << 16):
+                    f.write(chunk)
+    os.replace(tmp_path, path)
+
+
+def write_change_report(changes, markdown_path, email_path=None, title="Regulatory changes"):
+    """Render a stream of Changes as a Markdown digest and a plain-text email.
+
+    Changes are grouped by source, then flagged / not flagged, followed by
+    a per-ECCN tally. Each group is written to its own spooled temporary
+    file as changes arrive (kept in memory while small, on disk once
+    large), and the groups are stitched together at the end, so only the
+    counters are held in memory whatever the size of the diff.
+
+    Returns:
+        Counter of changes by kind
+    """
+    spools = {}
+    kinds = Counter()
+    by_eccn = {}
+
+    def spool(key):
+        if key not in spools:
+            spools[key] = (tempfile.SpooledTemporaryFile(max_size=1 << 20, mode="w+", encoding="utf-8"),
+                           tempfile.SpooledTemporaryFile(max_size=1 << 20, mode="w+", encoding="utf-8"))
+        return spools[key]
+
+    # Only rendering is timed: pulling from changes runs the diff itself
+    rendering = 0.0
+    for change in changes:
+        started = time.perf_counter()
+        kinds[change.kind] += 1
+        source = str(change.record["source"] or "Unknown source")
+        markdown, email = spool((source, not change.record["flagged"]))
+        markdown.write(_markdown_line(change))
+        email.write(_email_line(change))
+        for eccn in change.record["eccns_found"]:
+            by_eccn.setdefault(eccn, Counter())[change.kind] += 1
+        rendering += time.perf_counter() - started
+
+    started = time.perf_counter()
+    generated = datetime.now().strftime("%Y-%m-%d %H:%M")
+    summary = ", ".join(f"{kinds[kind]} {kind}" for kind in ("added", "removed", "modified"))
+    markdown_parts = [f"# {title}\n\n_Generated {generated}: {summary}._\n"]
+    email_parts = [f"{title}\nGenerated {generated}: {summary}\n"]
+    current_source = None
+    for (source, unflagged), (markdown, email) in sorted(spools.items()):
+        if source != current_source:
+            markdown_parts.append(f"\n## {source}\n")
+            email_parts.append(f"\n{source}\n{'=' * len(source)}\n")
+            current_source = source
+        heading = "Not flagged" if unflagged else "Flagged"
+        markdown_parts += [f"\n### {heading}\n\n", markdown]
+        email_parts += [f"\n{heading}:\n", email]
+
+    if by_eccn:
+        markdown_parts.append("\n## ECCNs\n\n| ECCN | Added | Removed | Modified |\n|---|---|---|---|\n")
+        email_parts.append("\nECCNs\n=====\n")
+        for eccn, counts in sorted(by_eccn.items()):
+            markdown_parts.append(f"| {eccn} | {counts['added']} | {counts['removed']} | {counts['modified']} |\n")
+            email_parts.append(f"  {eccn}: {counts['added']} added, {counts['removed']} removed, {counts['modified']} modified\n")
+    if not kinds:
+        markdown_parts.append("\nNo changes.\n")
+        email_parts.append("\nNo changes.\n")
+
+    _atomic_write(markdown_path, markdown_parts)
+    if email_path:
+        _atomic_write(email_path, email_parts)
+    for markdown, email in spools.values():
+        markdown.close()
+        email.close()
+    metrics.observe("report.changes", rendering + time.perf_counter() - started)
+
+    for kind, count in kinds.items():
+        metrics.incr(f"changes.{kind}", count)
+    return kinds
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 3:
+        sys.exit("usage: python -m scraper.change_tracker OLD NEW [OUT.md]  (CSV files or processed directories)")
+    out = sys.argv[3] if len(sys.argv) > 3 else os.path.join(REPORTS_DIR, f"changes_{datetime.now():%Y-%m-%d_%H-%M}.md")
+    counts = write_change_report(iter_changes(sys.argv[1], sys.argv[2]), out, os.path.splitext(out)[0] + ".txt")
+    print(f"📝 {sum(counts.values())} changes → {out}")
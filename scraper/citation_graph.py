@@ -0,0 +1,262 @@
+import json
+import os
+import re
+import tempfile
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+
+import pandas as pd
+
+from scraper.schema import parse_list
+
+GRAPH_PATH = "data/state/citation_graph.json"
+
+# A pinpoint cite ("90 FR 14052") is resolved to the stored rule starting at
+# or before that page, if it starts at most this many pages earlier
+MAX_RULE_PAGES = 300
+
+_FR_CITATION = re.compile(r"(\d{1,3})\s+FR\s+(\d{1,6})")
+_DOCUMENT_NUMBER = re.compile(r"\b\d{4}-\d{5}\b")
+_LAST = "\uffff"  # sorts after any node id, for bisecting on page alone
+
+
+def parse_citation(text):
+    """(volume, page) of an FR citation such as "90 FR 14046", or None."""
+    match = _FR_CITATION.search(str(text or ""))
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def format_citation(volume, page):
+    return f"{volume} FR {page}"
+
+
+def document_number(url):
+    """The FR document number in a notice URL (e.g. 2025-00636), or ""."""
+    match = _DOCUMENT_NUMBER.search(str(url or ""))
+    return match.group() if match else ""
+
+
+def edge_kind(title):
+    """How a notice relates to the rules it cites, judged from its title."""
+    return "corrects" if re.search(r"\bcorrect(?:ion|ing)\b", title or "", re.IGNORECASE) else "amends"
+
+
+class CitationGraph:
+    """Notices and the FR citations between them, as adjacency lists.
+
+    Only each notice's outgoing citations are stored; the reverse index
+    (which notices cite a page range) and the per-volume page index are
+    rebuilt on load, so a query is a couple of bisects plus a walk over
+    the matching edges.
+    """
+
+    def __init__(self, path=GRAPH_PATH):
+        self.path = path
+        self.nodes = {}      # node id → {citation, document_number, title, date, url, kind}
+        self.cites = {}      # node id → [cited FR citations as written]
+        self.aliases = {}    # document number / URL → node id
+        self._starts = {}    # volume → sorted [(start page, node id)]
+        self._cited = {}     # volume → sorted [(cited page, citing node id)]
+
+    @classmethod
+    def load(cls, path=GRAPH_PATH):
+        graph = cls(path)
+        try:
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return graph
+        graph.nodes, graph.cites, graph.aliases = state["nodes"], state["cites"], state["aliases"]
+        for node_id in graph.nodes:
+            graph._index(node_id, list.append)
+        # Sort once instead of insorting every entry
+        for pages in (*graph._starts.values(), *graph._cited.values()):
+            pages.sort()
+        return graph
+
+    def save(self):
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"nodes": self.nodes, "cites": self.cites, "aliases": self.aliases}, f)
+        os.replace(tmp_path, self.path)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def _index(self, node_id, add=insort):
+        start = parse_citation(self.nodes[node_id]["citation"])
+        if start:
+            add(self._starts.setdefault(start[0], []), (start[1], node_id))
+        for cited in self.cites.get(node_id, []):
+            target = parse_citation(cited)
+            if target:
+                add(self._cited.setdefault(target[0], []), (target[1], node_id))
+
+    def add(self, citation, url, title="", date=None, cited=()):
+        """Add a notice and its outgoing citations; returns False if already known."""
+        number = document_number(url)
+        start = parse_citation(citation)
+        node_id = format_citation(*start) if start else number or url
+        if not node_id or node_id in self.nodes or url in self.aliases:
+            return False
+        self.nodes[node_id] = {
+            "citation": format_citation(*start) if start else "",
+            "document_number": number,
+            "title": title or "",
+            "date": date,
+            "url": url or "",
+            "kind": edge_kind(title),
+        }
+        own = format_citation(*start) if start else None
+        self.cites[node_id] = sorted({
+            format_citation(*parsed) for parsed in map(parse_citation, cited) if parsed
+        } - {own})
+        for alias in (number, url):
+            if alias:
+                self.aliases[alias] = node_id
+        self._index(node_id)
+        return True
+
+    def resolve(self, ref):
+        """Node id for a citation, document number or URL, or None."""
+        if ref in self.nodes:
+            return ref
+        if ref in self.aliases:
+            return self.aliases[ref]
+        target = parse_citation(ref)
+        if not target:
+            return None
+        starts = self._starts.get(target[0], [])
+        i = bisect_right(starts, (target[1], _LAST)) - 1
+        if i >= 0 and target[1] - starts[i][0] <= MAX_RULE_PAGES:
+            return starts[i][1]
+        return None
+
+    def _page_range(self, node_id):
+        start = parse_citation(self.nodes[node_id]["citation"])
+        if not start:
+            return None
+        volume, page = start
+        starts = self._starts[volume]
+        i = bisect_right(starts, (page, _LAST))
+        end = min(starts[i][0] if i < len(starts) else page + MAX_RULE_PAGES + 1, page + MAX_RULE_PAGES + 1)
+        return volume, page, end
+
+    def references(self, ref):
+        """Stored notices a notice cites, in citation order."""
+        node_id = self.resolve(ref)
+        if node_id is None:
+            return []
+        found = []
+        for cited in self.cites.get(node_id, []):
+            target = self.resolve(cited)
+            if target and target != node_id and target not in found:
+                found.append(target)
+        return found
+
+    def cited_by(self, ref):
+        """Notices citing any page of a notice, as (node id, kind) pairs."""
+        node_id = self.resolve(ref)
+        if node_id is None or self._page_range(node_id) is None:
+            return []
+        volume, start, end = self._page_range(node_id)
+        pages = self._cited.get(volume, [])
+        lo, hi = bisect_left(pages, (start, "")), bisect_left(pages, (end, ""))
+        citing = dict.fromkeys(citer for _, citer in pages[lo:hi] if citer != node_id)
+        return [(citer, self.nodes[citer]["kind"]) for citer in citing]
+
+    def _is_later(self, node_id, other):
+        mine, theirs = self.nodes[node_id]["date"], self.nodes[other]["date"]
+        return not (mine and theirs) or theirs >= mine
+
+    def amended_by(self, ref, transitive=False):
+        """Later notices that cite this one (and, if transitive, their amenders)."""
+        node_id = self.resolve(ref)
+        if node_id is None:
+            return []
+        return self._walk(node_id, kinds={"amends", "corrects"}, transitive=transitive)
+
+    def corrections(self, ref):
+        """Transitive closure of corrections: corrections, their corrections, ..."""
+        node_id = self.resolve(ref)
+        if node_id is None:
+            return []
+        return self._walk(node_id, kinds={"corrects"}, transitive=True)
+
+    def _walk(self, node_id, kinds, transitive):
+        seen, order = {node_id}, []
+        queue = deque([node_id])
+        while queue:
+            current = queue.popleft()
+            for citer, kind in self.cited_by(current):
+                if kind in kinds and citer not in seen and self._is_later(current, citer):
+                    seen.add(citer)
+                    order.append(citer)
+                    if transitive:
+                        queue.append(citer)
+        return sorted(order, key=lambda other: (self.nodes[other]["date"] or "", other))
+
+    def describe(self, node_id):
+        return dict(self.nodes[node_id], id=node_id)
+
+
+def update_citation_graph(new_df, path=GRAPH_PATH):
+    """Add this run's notices to the stored graph.
+
+    Each notice contributes its own citation and the FR citations found
+    in its text; notices already in the graph are skipped, so the cost is
+    proportional to the new notices.
+
+    Returns:
+        Number of notices added
+    """
+    graph = CitationGraph.load(path)
+    added = 0
+    for row in new_df.sort_values("date", na_position="last").itertuples(index=False):
+        date = row.date.strftime("%Y-%m-%d") if pd.notna(row.date) else None
+        if graph.add(row.citation, row.url, row.title, date, parse_list(row.fr_citations)):
+            added += 1
+    if added:
+        graph.save()
+    return added
+
+
+def rebuild(processed_dir="data/processed", path=GRAPH_PATH):
+    """Build the graph from scratch out of the stored history."""
+    from scraper.history import load_history
+
+    if os.path.exists(path):
+        os.remove(path)
+    columns = ["citation", "url", "title", "date", "fr_citations"]
+    update_citation_graph(load_history(processed_dir=processed_dir, columns=columns), path)
+    return CitationGraph.load(path)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--rebuild":
+        graph = rebuild()
+        print(f"🕸️ {len(graph)} notices, {sum(len(c) for c in graph.cites.values())} citations → {graph.path}")
+        sys.exit()
+
+    graph = CitationGraph.load()
+    for ref in sys.argv[1:]:
+        started = time.perf_counter()
+        node_id = graph.resolve(ref)
+        if node_id is None:
+            print(f"❓ {ref} is not a stored notice")
+            continue
+        node = graph.nodes[node_id]
+        amended = graph.amended_by(node_id, transitive=True)
+        corrected = graph.corrections(node_id)
+        cites = graph.references(node_id)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"📜 {node_id} ({node['date']}): {node['title']}")
+        for label, ids in (("cites", cites), ("amended by", amended), ("corrections", corrected)):
+            for other in ids:
+                print(f"   {label}: {other} ({graph.nodes[other]['date']}) {graph.nodes[other]['title']}")
+        print(f"   ⏱️ {elapsed:.2f} ms")
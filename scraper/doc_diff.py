@@ -0,0 +1,225 @@
+import bisect
+import difflib
+import hashlib
+import html
+import re
+
+from scraper.utils import extract_pdf_blocks
+
+SENTENCE_END = re.compile(r"[.:;!?)\]”’\"]\s*$")
+WORD_SPLIT = re.compile(r"\S+")
+MARKDOWN_SPECIAL = re.compile(r"([\\`*_~#|\[\]<>])")
+
+
+def normalize(text):
+    """Collapse whitespace and rejoin words hyphenated across line breaks."""
+    text = re.sub(r"(\w)[-–]\s*\n\s*(\w)", r"\1\2", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def merge_blocks(blocks):
+    """Join PDF text blocks that were split across columns or pages.
+
+    A block continues into the next one when it does not end a sentence
+    and the next block starts in lower case.
+    """
+    paragraphs = []
+    for block in blocks:
+        text = normalize(block)
+        if not text:
+            continue
+        if paragraphs and not SENTENCE_END.search(paragraphs[-1]) and text[0].islower():
+            paragraphs[-1] = f"{paragraphs[-1]} {text}"
+        else:
+            paragraphs.append(text)
+    return paragraphs
+
+
+def split_paragraphs(text):
+    """Split plain text on blank lines into normalized paragraphs."""
+    return merge_blocks(re.split(r"\n\s*\n", text))
+
+
+def paragraph_hash(paragraph):
+    """Hash of a paragraph up to whitespace; case changes ("Shall" → "shall") count."""
+    return hashlib.blake2b(" ".join(paragraph.split()).encode("utf-8"), digest_size=8).digest()
+
+
+def align(old_hashes, new_hashes):
+    """Match identical paragraphs between two versions.
+
+    Uses Heckel's algorithm: paragraphs unique to both sides are anchors,
+    and anchors are extended to neighbouring identical paragraphs. Crossing
+    matches (moved text) are then dropped by keeping the longest increasing
+    run of anchors, so the result can be read top to bottom.
+
+    Returns:
+        List of (old_index, new_index) pairs in increasing order
+    """
+    table = {}
+    for i, h in enumerate(old_hashes):
+        entry = table.setdefault(h, [0, 0, i])
+        entry[0] += 1
+    for h in new_hashes:
+        table.setdefault(h, [0, 0, -1])[1] += 1
+
+    new_match = [-1] * len(new_hashes)
+    old_match = [-1] * len(old_hashes)
+    for j, h in enumerate(new_hashes):
+        old_count, new_count, i = table[h]
+        if old_count == 1 and new_count == 1:
+            new_match[j], old_match[i] = i, j
+
+    for j in range(len(new_hashes) - 1):
+        i = new_match[j]
+        if i >= 0 and i + 1 < len(old_hashes) and new_match[j + 1] < 0 and old_match[i + 1] < 0 \
+                and old_hashes[i + 1] == new_hashes[j + 1]:
+            new_match[j + 1], old_match[i + 1] = i + 1, j + 1
+    for j in range(len(new_hashes) - 1, 0, -1):
+        i = new_match[j]
+        if i > 0 and new_match[j - 1] < 0 and old_match[i - 1] < 0 \
+                and old_hashes[i - 1] == new_hashes[j - 1]:
+            new_match[j - 1], old_match[i - 1] = i - 1, j - 1
+
+    # Longest increasing subsequence of old indices (patience sorting)
+    pairs = [(i, j) for j, i in enumerate(new_match) if i >= 0]
+    tails, tail_idx, prev = [], [], [-1] * len(pairs)
+    for k, (i, _) in enumerate(pairs):
+        pos = bisect.bisect_left(tails, i)
+        if pos == len(tails):
+            tails.append(i)
+            tail_idx.append(k)
+        else:
+            tails[pos] = i
+            tail_idx[pos] = k
+        prev[k] = tail_idx[pos - 1] if pos else -1
+
+    kept = []
+    k = tail_idx[-1] if tail_idx else -1
+    while k >= 0:
+        kept.append(pairs[k])
+        k = prev[k]
+    return kept[::-1]
+
+
+def diff_paragraphs(old_paragraphs, new_paragraphs, similarity=0.5):
+    """Compute paragraph-level edit operations between two versions.
+
+    Returns:
+        List of (op, old_text, new_text) where op is 'equal', 'insert',
+        'delete' or 'replace'. Unchanged paragraphs are never compared
+        word by word; only gaps between anchors are.
+    """
+    anchors = align([paragraph_hash(p) for p in old_paragraphs],
+                    [paragraph_hash(p) for p in new_paragraphs])
+    anchors.append((len(old_paragraphs), len(new_paragraphs)))
+
+    ops = []
+    i = j = 0
+    for anchor_i, anchor_j in anchors:
+        old_gap = old_paragraphs[i:anchor_i]
+        new_gap = new_paragraphs[j:anchor_j]
+        for k in range(max(len(old_gap), len(new_gap))):
+            old_text = old_gap[k] if k < len(old_gap) else None
+            new_text = new_gap[k] if k < len(new_gap) else None
+            if old_text is None:
+                ops.append(("insert", None, new_text))
+            elif new_text is None:
+                ops.append(("delete", old_text, None))
+            elif difflib.SequenceMatcher(None, old_text, new_text).quick_ratio() >= similarity:
+                ops.append(("replace", old_text, new_text))
+            else:
+                ops.append(("delete", old_text, None))
+                ops.append(("insert", None, new_text))
+        if anchor_i < len(old_paragraphs):
+            ops.append(("equal", old_paragraphs[anchor_i], new_paragraphs[anchor_j]))
+        i, j = anchor_i + 1, anchor_j + 1
+    return ops
+
+
+def word_diff(old_text, new_text):
+    """Return (tag, text) runs of a word-level diff of two paragraphs."""
+    old_words = WORD_SPLIT.findall(old_text)
+    new_words = WORD_SPLIT.findall(new_text)
+    runs = []
+    matcher = difflib.SequenceMatcher(None, old_words, new_words, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag in ("delete", "replace"):
+            runs.append(("del", " ".join(old_words[i1:i2])))
+        if tag in ("insert", "replace"):
+            runs.append(("ins", " ".join(new_words[j1:j2])))
+        if tag == "equal":
+            runs.append(("equal", " ".join(old_words[i1:i2])))
+    return runs
+
+
+def _numbered(ops):
+    """Yield changed ops with the paragraph number they have in the new text."""
+    number = 0
+    for op, old_text, new_text in ops:
+        if op != "delete":
+            number += 1
+        if op != "equal":
+            yield max(number, 1), op, old_text, new_text
+
+
+def markdown_escape(text):
+    return MARKDOWN_SPECIAL.sub(r"\\\1", text)
+
+
+def render_markdown(ops):
+    """Render changed paragraphs as a Markdown redline (~~old~~ **new**)."""
+    lines = []
+    for n, op, old_text, new_text in _numbered(ops):
+        if op == "insert":
+            body = f"**{markdown_escape(new_text)}**"
+        elif op == "delete":
+            body = f"~~{markdown_escape(old_text)}~~"
+        else:
+            body = " ".join(
+                f"~~{markdown_escape(text)}~~" if tag == "del"
+                else f"**{markdown_escape(text)}**" if tag == "ins" else markdown_escape(text)
+                for tag, text in word_diff(old_text, new_text)
+            )
+        lines.append(f"- ¶{n} ({op}): {body}")
+    return "\n".join(lines) if lines else "_No textual changes._"
+
+
+def render_html(ops):
+    """Render changed paragraphs as an HTML redline using <del>/<ins>."""
+    parts = ['<div class="redline">']
+    for n, op, old_text, new_text in _numbered(ops):
+        if op == "insert":
+            body = f"<ins>{html.escape(new_text)}</ins>"
+        elif op == "delete":
+            body = f"<del>{html.escape(old_text)}</del>"
+        else:
+            body = " ".join(
+                f"<{tag}>{html.escape(text)}</{tag}>" if tag != "equal" else html.escape(text)
+                for tag, text in word_diff(old_text, new_text)
+            )
+        parts.append(f'<p data-paragraph="{n}" class="{op}">{body}</p>')
+    parts.append("</div>")
+    return "\n".join(parts)
+
+
+def diff_pdfs(old_source, new_source, fmt="markdown"):
+    """Redline the text of two rule PDFs (paths or bytes)."""
+    ops = diff_paragraphs(merge_blocks(extract_pdf_blocks(old_source)),
+                          merge_blocks(extract_pdf_blocks(new_source)))
+    return render_html(ops) if fmt == "html" else render_markdown(ops)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Paragraph-level redline of two rule PDFs.")
+    parser.add_argument("old_pdf")
+    parser.add_argument("new_pdf")
+    parser.add_argument("--format", choices=["markdown", "html"], default="markdown")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    print(diff_pdfs(args.old_pdf, args.new_pdf, args.format))
+    print(f"\n⏱️ Diffed in {time.perf_counter() - started:.3f}s")
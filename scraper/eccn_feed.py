@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+
+from scraper.citation_graph import document_number
+from scraper.history import quarter_label
+from scraper.schema import parse_list
+
+FEED_COLUMNS = ["run_date", "eccn", "change", "rules_before", "rules_after", "first_seen", "urls"]
+STATE_PATH = "data/state/eccn_state.json"
+SEEN_DIR = "data/state/eccn_seen"
+
+
+def notice_id(row):
+    """Stable id of a notice: FR document number, else URL, else citation + title + date."""
+    number = document_number(row.url)
+    if number:
+        return number
+    if row.url:
+        return row.url
+    date = row.publication_date if pd.notna(row.publication_date) else row.date
+    key = f"{row.citation}|{row.title}|{date.strftime('%Y-%m-%d') if pd.notna(date) else ''}"
+    return "sha1:" + hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def _quarter(row):
+    date = row.publication_date if pd.notna(row.publication_date) else row.date
+    return quarter_label(date) or "undated"
+
+
+def _seen_path(quarter, seen_dir):
+    return os.path.join(seen_dir, f"{quarter}.txt")
+
+
+def load_seen(quarter, seen_dir=SEEN_DIR):
+    """Ids already counted for notices published in a quarter."""
+    try:
+        with open(_seen_path(quarter, seen_dir), encoding="utf-8") as f:
+            return set(f.read().split())
+    except FileNotFoundError:
+        return set()
+
+
+def append_seen(quarter, ids, seen_dir=SEEN_DIR):
+    os.makedirs(seen_dir, exist_ok=True)
+    with open(_seen_path(quarter, seen_dir), "a", encoding="utf-8") as f:
+        f.write("".join(f"{notice_id}\n" for notice_id in ids))
+
+
+def load_state(state_path=STATE_PATH, seen_dir=SEEN_DIR):
+    """Load the per-ECCN counters.
+
+    State files from before the per-quarter seen lists kept every URL in
+    "seen_urls"; those are moved to the seen lists once, using the stored
+    history to find each URL's quarter.
+    """
+    try:
+        with open(state_path, encoding="utf-8") as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        state = {"eccns": {}}
+    if "seen_urls" in state:
+        _migrate_seen_urls(state.pop("seen_urls"), seen_dir)
+        save_state(state, state_path)
+    return state
+
+
+def _migrate_seen_urls(urls, seen_dir):
+    from scraper.history import load_history
+
+    history = load_history(columns=["url", "citation", "title"])
+    by_url = {row.url: row for row in history.itertuples(index=False) if row.url}
+    per_quarter = {}
+    for url in urls:
+        row = by_url.get(url)
+        quarter = _quarter(row) if row is not None else "undated"
+        per_quarter.setdefault(quarter, set()).add(notice_id(row) if row is not None else document_number(url) or url)
+    for quarter, ids in per_quarter.items():
+        append_seen(quarter, sorted(ids - load_seen(quarter, seen_dir)), seen_dir)
+
+
+def save_state(state, state_path=STATE_PATH):
+    directory = os.path.dirname(state_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, state_path)
+
+
+def update_eccn_feed(new_df, state_path=STATE_PATH,
+                     feed_path="data/processed/eccn_feed.csv", seen_dir=SEEN_DIR):
+    """Fold this run's notices into the ECCN state and append the changes.
+
+    Notices are keyed by notice_id and deduplicated within the batch; only
+    ids not counted before are looked at. Counted ids are appended to one
+    seen list per publication quarter, and only the lists of the batch's
+    quarters are read, so the cost is proportional to the new notices and
+    the quarters they fall in, not to the history. The state file holds
+    just the per-ECCN counters.
+
+    Returns:
+        DataFrame of feed rows: ECCNs seen for the first time ('new') and
+        ECCNs that now appear in more rules than before ('increased').
+    """
+    state = load_state(state_path, seen_dir)
+    eccns = state["eccns"]
+    run_date = datetime.now().strftime("%Y-%m-%d")
+
+    # Ids of undated notices (and of migrated URLs no longer in the
+    # history) may belong to any quarter, so that list is always checked
+    seen, counted, fresh = {"undated": load_seen("undated", seen_dir)}, set(), []
+    for row in new_df.sort_values("date", na_position="last").itertuples(index=False):
+        quarter, key = _quarter(row), notice_id(row)
+        if quarter not in seen:
+            seen[quarter] = load_seen(quarter, seen_dir)
+        if key in seen[quarter] or key in seen["undated"] or key in counted:
+            continue
+        counted.add(key)
+        fresh.append((quarter, key, row))
+
+    changes = {}
+    for _, _, row in fresh:
+        notice_date = row.date.strftime("%Y-%m-%d") if pd.notna(row.date) else None
+        for eccn in parse_list(row.eccns_found):
+            entry = eccns.get(eccn)
+            if entry is None:
+                entry = eccns[eccn] = {"first_seen": notice_date, "last_seen": notice_date, "rule_count": 0}
+                change = changes.setdefault(eccn, {"change": "new", "rules_before": 0, "urls": []})
+            else:
+                change = changes.setdefault(eccn, {"change": "increased", "rules_before": entry["rule_count"], "urls": []})
+                if notice_date and (entry["first_seen"] is None or notice_date < entry["first_seen"]):
+                    entry["first_seen"] = notice_date
+                if notice_date and (entry["last_seen"] is None or notice_date > entry["last_seen"]):
+                    entry["last_seen"] = notice_date
+            entry["rule_count"] += 1
+            change["urls"].append(row.url)
+
+    save_state(state, state_path)
+    new_ids = {}
+    for quarter, key, _ in fresh:
+        new_ids.setdefault(quarter, []).append(key)
+    for quarter, ids in new_ids.items():
+        append_seen(quarter, ids, seen_dir)
+
+    feed = pd.DataFrame([
+        {
+            "run_date": run_date,
+            "eccn": eccn,
+            "change": change["change"],
+            "rules_before": change["rules_before"],
+            "rules_after": eccns[eccn]["rule_count"],
+            "first_seen": eccns[eccn]["first_seen"],
+            "urls": json.dumps(change["urls"]),
+        }
+        for eccn, change in sorted(changes.items())
+    ], columns=FEED_COLUMNS)
+
+    if not feed.empty:
+        os.makedirs(os.path.dirname(feed_path) or ".", exist_ok=True)
+        feed.to_csv(feed_path, mode="a", index=False, header=not os.path.exists(feed_path))
+    return feed
+
+
+def first_seen_dates(state_path=STATE_PATH):
+    """Return a DataFrame of every ECCN with its first-seen date and rule count."""
+    eccns = load_state(state_path)["eccns"]
+    return pd.DataFrame(
+        [{"eccn": eccn, **entry} for eccn, entry in sorted(eccns.items())],
+        columns=["eccn", "first_seen", "last_seen", "rule_count"],
+    )
@@ -0,0 +1,226 @@
+import os
+import re
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+
+from scraper.schema import coerce_notices, read_notices_csv, write_notices_csv
+
+PARTITION_PATTERN = re.compile(r"^BIS_master_(\d{4})_Q([1-4])\.csv$")
+UNDATED_PARTITION = "BIS_master_undated.csv"
+# Written once every partition is known to hold only its own quarter
+LAYOUT_MARKER = ".partitioned_by_publication_date"
+
+
+def quarter_label(date):
+    """Return the partition label for a notice date, e.g. '2025_Q1'."""
+    if date is None or pd.isna(date):
+        return None
+    return f"{date.year}_Q{(date.month - 1) // 3 + 1}"
+
+
+def quarter_bounds(year, quarter):
+    """Return (first_day, last_day) of a quarter as Timestamps."""
+    start = pd.Timestamp(year=year, month=3 * (quarter - 1) + 1, day=1)
+    end = start + pd.offsets.QuarterEnd(0)
+    return start, end
+
+
+def partition_path(label, processed_dir="data/processed"):
+    if label is None:
+        return os.path.join(processed_dir, UNDATED_PARTITION)
+    return os.path.join(processed_dir, f"BIS_master_{label}.csv")
+
+
+def list_partitions(processed_dir="data/processed"):
+    """List the quarter partitions on disk, oldest first.
+
+    Returns:
+        List of (label, start, end, path) tuples. The undated partition, if
+        present, is returned last with start and end set to None.
+    """
+    if not os.path.isdir(processed_dir):
+        return []
+
+    partitions = []
+    for name in os.listdir(processed_dir):
+        match = PARTITION_PATTERN.match(name)
+        if match:
+            year, quarter = int(match.group(1)), int(match.group(2))
+            start, end = quarter_bounds(year, quarter)
+            partitions.append((f"{year}_Q{quarter}", start, end, os.path.join(processed_dir, name)))
+    partitions.sort(key=lambda p: p[1])
+
+    undated = os.path.join(processed_dir, UNDATED_PARTITION)
+    if os.path.exists(undated):
+        partitions.append((None, None, None, undated))
+    return partitions
+
+
+def prune_partitions(partitions, start=None, end=None):
+    """Keep only partitions whose quarter overlaps [start, end]."""
+    if start is None and end is None:
+        return partitions
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+
+    kept = []
+    for label, p_start, p_end, path in partitions:
+        if label is None:
+            continue
+        if start is not None and p_end < start.normalize():
+            continue
+        if end is not None and p_start > end:
+            continue
+        kept.append((label, p_start, p_end, path))
+    return kept
+
+
+def split_by_quarter(df):
+    """Group notices by the quarter of their publication date.
+
+    Returns:
+        Dict of partition label (None for undated notices) → DataFrame
+    """
+    dates = df["publication_date"].fillna(df["date"])
+    labels = dates.map(quarter_label)
+    return {
+        (label if isinstance(label, str) else None): group
+        for label, group in df.groupby(labels, dropna=False, sort=True)
+    }
+
+
+def write_partitions(new_df, processed_dir="data/processed"):
+    """Merge new notices into the quarter partitions they belong to.
+
+    Returns:
+        (touched, inserted) where touched maps partition label → combined
+        DataFrame for every partition written, and inserted holds only the
+        rows whose URL was not already stored.
+    """
+    ensure_partitioned(processed_dir)
+    return _merge_partitions(new_df, processed_dir)
+
+
+def _merge_partitions(new_df, processed_dir):
+    os.makedirs(processed_dir, exist_ok=True)
+    touched = {}
+    inserted = []
+    for label, part_df in split_by_quarter(new_df).items():
+        path = partition_path(label, processed_dir)
+        part_df = part_df.drop_duplicates(subset=["url"])
+        if os.path.exists(path):
+            old_df = read_notices_csv(path)
+            inserted.append(part_df[~part_df["url"].isin(old_df["url"])])
+            combined_df = coerce_notices(pd.concat([old_df, part_df]).drop_duplicates(subset=["url"]))
+        else:
+            inserted.append(part_df)
+            combined_df = part_df
+        write_notices_csv(combined_df, path)
+        touched[label] = combined_df
+    inserted_df = coerce_notices(pd.concat(inserted)) if inserted else new_df.iloc[0:0]
+    return touched, inserted_df
+
+
+def load_history(start=None, end=None, processed_dir="data/processed", columns=None):
+    """Load notices published between start and end (inclusive).
+
+    Only the quarter partitions overlapping the range are read; with no
+    range the consolidated view across all quarters (and undated notices)
+    is returned.
+    """
+    partitions = prune_partitions(list_partitions(processed_dir), start, end)
+    usecols = None
+    if columns is not None:
+        usecols = lambda c: c in set(columns) | {"publication_date", "date"}
+
+    frames = [read_notices_csv(path, usecols=usecols) for _, _, _, path in partitions]
+    if not frames:
+        return coerce_notices(pd.DataFrame())
+
+    df = coerce_notices(pd.concat(frames, ignore_index=True))
+    if start is not None or end is not None:
+        dates = df["publication_date"].fillna(df["date"])
+        mask = dates.notna()
+        if start is not None:
+            mask &= dates >= pd.Timestamp(start)
+        if end is not None:
+            mask &= dates <= pd.Timestamp(end)
+        df = df[mask].reset_index(drop=True)
+    if columns is not None:
+        df = df[list(columns)]
+    return df
+
+
+def repartition(processed_dir="data/processed"):
+    """Rewrite existing master CSVs so each notice sits in its own quarter.
+
+    Older runs filed notices by run date (a March notice fetched in April
+    landed in Q2); this moves them to the quarter of their publication date.
+    Every new partition is written to a temporary file first and moved
+    into place, and only then are partitions left empty removed, so a
+    crash midway loses nothing (the next run repartitions again). Notices
+    are deduplicated by URL, keeping the first; those without a URL are
+    all kept.
+    """
+    df = load_history(processed_dir=processed_dir)
+    if df.empty:
+        return {}
+    old_paths = {path for _, _, _, path in list_partitions(processed_dir)}
+    df = df[(df["url"] == "") | ~df["url"].duplicated()]
+
+    touched, written = {}, []
+    try:
+        for label, part_df in split_by_quarter(df).items():
+            fd, tmp_path = tempfile.mkstemp(dir=processed_dir, suffix=".tmp")
+            os.close(fd)
+            written.append((tmp_path, partition_path(label, processed_dir)))
+            write_notices_csv(part_df, tmp_path)
+            touched[label] = part_df
+    except BaseException:
+        for tmp_path, _ in written:
+            os.remove(tmp_path)
+        raise
+    for tmp_path, path in written:
+        os.replace(tmp_path, path)
+    for path in old_paths - {path for _, path in written}:
+        os.remove(path)
+    open(os.path.join(processed_dir, LAYOUT_MARKER), "w").close()
+    return touched
+
+
+def ensure_partitioned(processed_dir="data/processed"):
+    """Repartition master CSVs written by older runs before anything is merged.
+
+    Older runs filed notices by run date, so e.g. BIS_master_2025_Q2.csv
+    can hold Q1 notices; deduplicating a new batch against the Q1 partition
+    alone would store them twice. Every partition's dates are checked once
+    and the marker file records the result, so later runs skip the check.
+
+    Returns:
+        The touched partitions if a repartition ran, else {}
+    """
+    marker = os.path.join(processed_dir, LAYOUT_MARKER)
+    if os.path.exists(marker):
+        return {}
+    touched = {}
+    for label, _, _, path in list_partitions(processed_dir):
+        dates = read_notices_csv(path, usecols=lambda c: c in {"publication_date", "date"})
+        if set(split_by_quarter(dates)) - {label}:
+            print(f"📁 {os.path.basename(path)} holds notices of other quarters, repartitioning {processed_dir}")
+            touched = repartition(processed_dir)
+            break
+    os.makedirs(processed_dir, exist_ok=True)
+    open(marker, "w").close()
+    return touched
+
+
+if __name__ == "__main__":
+    import sys
+
+    target = sys.argv[1] if len(sys.argv) > 1 else "data/processed"
+    touched = repartition(target)
+    for label, part_df in touched.items():
+        print(f"📁 {label or 'undated'}: {len(part_df)} notices")
+    print(f"✅ Repartitioned {target} at {datetime.now():%Y-%m-%d %H:%M}")
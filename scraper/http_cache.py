@@ -0,0 +1,233 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from dataclasses import dataclass, field
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from scraper import rate_limit
+
+CACHE_DIR = os.environ.get("REGULUS_HTTP_CACHE", "data/cache/http")
+
+# "live": serve fresh entries, revalidate stale ones, record everything.
+# "replay": never touch the network; serve whatever was recorded.
+MODE = os.environ.get("REGULUS_HTTP_MODE", "live")
+
+# First matching pattern wins; TTLs in seconds.
+DEFAULT_TTLS = [
+    (r"\.pdf$", 30 * 86400),                     # published rules do not change
+    (r"federal-register-notices", 15 * 60),      # listing table
+    (r"federalregister\.gov/api/", 86400),       # backfill enumeration
+    (r"bis\.(?:doc\.)?gov", 3600),
+    (r"", 3600),
+]
+
+KEPT_HEADERS = ("Content-Type", "Content-Length", "ETag", "Last-Modified")
+
+
+class CacheMiss(Exception):
+    """Raised in replay mode when a URL was never recorded."""
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    """Minimal stand-in for requests.Response served from or into the cache."""
+    url: str
+    status_code: int
+    headers: dict = field(default_factory=dict)
+    content: bytes = b""
+    from_cache: bool = False
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def set_mode(mode):
+    """Switch between 'live' and 'replay' for the rest of the process."""
+    global MODE
+    if mode not in ("live", "replay"):
+        raise ValueError(f"Unknown HTTP cache mode: {mode}")
+    MODE = mode
+
+
+def ttl_for(url, ttls=None):
+    for pattern, ttl in ttls or DEFAULT_TTLS:
+        if re.search(pattern, url):
+            return ttl
+    return 0
+
+
+def _paths(method, url, cache_dir):
+    key = hashlib.sha256(f"{method} {url}".encode("utf-8")).hexdigest()
+    base = os.path.join(cache_dir, key[:2], key)
+    return base + ".json", base + ".body"
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _load(method, url, cache_dir):
+    meta_path, body_path = _paths(method, url, cache_dir)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        body = b""
+        if method == "GET":
+            with open(body_path, "rb") as f:
+                body = f.read()
+    except (FileNotFoundError, ValueError):
+        return None, None
+    return meta, body
+
+
+def _save(method, url, status_code, headers, body, cache_dir):
+    meta_path, body_path = _paths(method, url, cache_dir)
+    meta = {
+        "url": url,
+        "method": method,
+        "status_code": status_code,
+        "headers": {k: headers[k] for k in KEPT_HEADERS if k in headers},
+        "fetched_at": time.time(),
+    }
+    if method == "GET":
+        _write_atomic(body_path, body)
+    _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+    return meta
+
+
+def _from_meta(meta, body):
+    return CachedResponse(meta["url"], meta["status_code"], CaseInsensitiveDict(meta["headers"]), body, from_cache=True)
+
+
+def lookup(url, method="GET", ttl=None, cache_dir=None):
+    """Return the recorded response for url if it is still fresh, else None.
+
+    In replay mode freshness is ignored.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    meta, body = _load(method, url, cache_dir)
+    if meta is None:
+        return None
+    ttl = ttl_for(url) if ttl is None else ttl
+    if MODE == "replay" or time.time() - meta["fetched_at"] < ttl:
+        return _from_meta(meta, body)
+    return None
+
+
+def store(url, content, headers=None, status_code=200, cache_dir=None):
+    """Record a response fetched by other means (e.g. a Selenium page source)."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    _save("GET", url, status_code, headers or {}, content, cache_dir or CACHE_DIR)
+
+
+def request(method, url, timeout=10, ttl=None, cache=True, cache_dir=None, retries=2, **kwargs):
+    """Fetch url through the cache.
+
+    Fresh entries are served without a request; stale ones are revalidated
+    with If-None-Match / If-Modified-Since and a 304 just refreshes them.
+    Network requests go through the shared per-host rate limiter and a
+    429/5xx is retried up to `retries` times once the limiter lets it.
+    With cache=False the response is returned but not recorded.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    meta, body = _load(method, url, cache_dir) if cache else (None, None)
+    ttl = ttl_for(url) if ttl is None else ttl
+
+    if MODE == "replay":
+        if meta is None:
+            raise CacheMiss(f"{method} {url} not recorded (replay mode)")
+        return _from_meta(meta, body)
+    if meta is not None and time.time() - meta["fetched_at"] < ttl:
+        return _from_meta(meta, body)
+
+    headers = dict(kwargs.pop("headers", None) or {})
+    if meta is not None:
+        if "ETag" in meta["headers"]:
+            headers["If-None-Match"] = meta["headers"]["ETag"]
+        if "Last-Modified" in meta["headers"]:
+            headers["If-Modified-Since"] = meta["headers"]["Last-Modified"]
+
+    kwargs.setdefault("allow_redirects", True)
+    for attempt in range(retries + 1):
+        with rate_limit.slot(url) as slot:
+            response = requests.request(method, url, headers=headers, timeout=timeout, **kwargs)
+            slot.record(response)
+        if response.status_code not in rate_limit.THROTTLE_STATUSES:
+            break
+
+    if response.status_code == 304 and meta is not None:
+        meta = _save(method, url, meta["status_code"], meta["headers"], body, cache_dir)
+        return _from_meta(meta, body)
+
+    content = response.content if method == "GET" else b""
+    if cache and response.status_code == 200:
+        _save(method, url, response.status_code, response.headers, content, cache_dir)
+    return CachedResponse(url, response.status_code, response.headers, content)
+
+
+def read_into(url, buffer, timeout=10, retries=2, **kwargs):
+    """GET url straight into a caller-owned bytearray, bypassing the cache.
+
+    The body is read with readinto, so a buffer reused across downloads
+    holds the only in-memory copy of the document. Goes through the rate
+    limiter and retries like request().
+
+    Returns:
+        (response, length): response has the status and headers but no
+        body; the body is buffer[:length]
+
+    Raises:
+        ValueError if the body does not fit in the buffer
+    """
+    if MODE == "replay":
+        raise CacheMiss(f"GET {url} not recorded (replay mode)")
+    kwargs.setdefault("allow_redirects", True)
+    length = 0
+    for attempt in range(retries + 1):
+        with rate_limit.slot(url) as slot:
+            response = requests.get(url, timeout=timeout, stream=True, **kwargs)
+            slot.record(response)
+            with response:
+                if response.status_code == 200:
+                    response.raw.decode_content = True
+                    with memoryview(buffer) as view:
+                        while length < len(view):
+                            read = response.raw.readinto(view[length:])
+                            if not read:
+                                break
+                            length += read
+                        else:
+                            if response.raw.read(1):
+                                raise ValueError(f"{url} is larger than the {len(view)}-byte buffer")
+        if response.status_code not in rate_limit.THROTTLE_STATUSES:
+            break
+    return CachedResponse(url, response.status_code, response.headers, b""), length
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def head(url, **kwargs):
+    return request("HEAD", url, **kwargs)
+
+
+def clear(cache_dir=None):
+    """Delete every recorded response."""
+    import shutil
+
+    shutil.rmtree(cache_dir or CACHE_DIR, ignore_errors=True)
@@ -0,0 +1,198 @@
+import json
+import os
+import socket
+import sqlite3
+import time
+from dataclasses import dataclass
+
+QUEUE_PATH = "data/state/jobs.sqlite"
+VISIBILITY_TIMEOUT = 600
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    updated_at REAL NOT NULL,
+    UNIQUE (batch, kind, key)
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, available_at);
+CREATE INDEX IF NOT EXISTS jobs_batch ON jobs (batch, status);
+"""
+
+
+@dataclass(slots=True)
+class Job:
+    id: int
+    batch: str
+    kind: str
+    key: str
+    payload: dict
+    attempts: int
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobQueue:
+    """SQLite-backed work queue with leases, visibility timeouts and retries.
+
+    A claimed job is leased to one worker until lease_expires; if the
+    worker dies the lease lapses and the job becomes claimable again,
+    unless it has used up max_attempts, in which case it is marked failed
+    (a PDF that kills every worker must not loop forever). A failed job
+    is retried with exponential back-off until max_attempts, then marked
+    failed. Every state change is a single transaction, so any number of
+    worker processes can share the file. The default rollback journal is
+    kept rather than WAL, which needs shared memory and so breaks on
+    network filesystems; hosts sharing the queue still need a disk whose
+    POSIX locks work (local disk or a correctly configured NFS mount).
+    """
+
+    def __init__(self, path=QUEUE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        # WAL is sticky, so queue files created before this switch back explicitly
+        self.db.execute("PRAGMA journal_mode=DELETE")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def enqueue(self, batch, kind, key, payload, max_attempts=MAX_ATTEMPTS):
+        """Add a job unless the batch already has one with the same kind and key."""
+        now = time.time()
+        cursor = self.db.execute(
+            "INSERT OR IGNORE INTO jobs (batch, kind, key, payload, max_attempts, available_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (batch, kind, key, json.dumps(payload, default=str), max_attempts, now, now),
+        )
+        return cursor.rowcount == 1
+
+    def expire_leases(self, now=None):
+        """Mark failed the lapsed leases of jobs with no attempts left."""
+        now = now or time.time()
+        cursor = self.db.execute(
+            "UPDATE jobs SET status = 'failed', error = COALESCE(error || '; ', '') || ?, lease_owner = NULL, "
+            "lease_expires = NULL, updated_at = ? "
+            "WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+            ("lease expired on the last attempt", now, now),
+        )
+        return cursor.rowcount
+
+    def claim(self, owner=None, visibility_timeout=VISIBILITY_TIMEOUT, kinds=None):
+        """Lease the oldest available job (or one whose lease lapsed); None if idle."""
+        owner = owner or worker_id()
+        now = time.time()
+        kind_filter = ""
+        params = [now, now]
+        if kinds:
+            kind_filter = f" AND kind IN ({', '.join('?' * len(kinds))})"
+            params += list(kinds)
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            self.expire_leases(now)
+            row = self.db.execute(
+                "SELECT id, batch, kind, key, payload, attempts FROM jobs "
+                "WHERE ((status = 'queued' AND available_at <= ?) OR (status = 'leased' AND lease_expires < ? AND attempts < max_attempts))"
+                f"{kind_filter} ORDER BY id LIMIT 1",
+                params,
+            ).fetchone()
+            if row is None:
+                self.db.execute("COMMIT")
+                return None
+            self.db.execute(
+                "UPDATE jobs SET status = 'leased', attempts = attempts + 1, lease_owner = ?, "
+                "lease_expires = ?, updated_at = ? WHERE id = ?",
+                (owner, now + visibility_timeout, now, row[0]),
+            )
+            self.db.execute("COMMIT")
+        except Exception:
+            self.db.execute("ROLLBACK")
+            raise
+        job_id, batch, kind, key, payload, attempts = row
+        return Job(job_id, batch, kind, key, json.loads(payload), attempts + 1)
+
+    def extend(self, job, owner=None, visibility_timeout=VISIBILITY_TIMEOUT):
+        """Push a held lease further out (for jobs that run long)."""
+        cursor = self.db.execute(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+            "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (time.time() + visibility_timeout, time.time(), job.id, owner or worker_id()),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job, result, owner=None):
+        """Store a job's result. Ignored if the lease was lost to another worker."""
+        cursor = self.db.execute(
+            "UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (json.dumps(result, default=str), time.time(), job.id, owner or worker_id()),
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job, error, owner=None, backoff=5.0):
+        """Record a failure; requeue with back-off or give up after max_attempts."""
+        now = time.time()
+        cursor = self.db.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END, "
+            "available_at = ?, error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+            (now + backoff * 2 ** (job.attempts - 1), str(error), now, job.id, owner or worker_id()),
+        )
+        return cursor.rowcount == 1
+
+    def counts(self, batch=None):
+        """Number of jobs per status, optionally for one batch."""
+        where, params = ("WHERE batch = ?", (batch,)) if batch else ("", ())
+        rows = self.db.execute(f"SELECT status, COUNT(*) FROM jobs {where} GROUP BY status", params)
+        counts = {"queued": 0, "leased": 0, "done": 0, "failed": 0}
+        counts.update(dict(rows.fetchall()))
+        return counts
+
+    def results(self, batch):
+        """(key, result or None, error) for every job in a batch, in enqueue order."""
+        rows = self.db.execute("SELECT key, result, error FROM jobs WHERE batch = ? ORDER BY id", (batch,))
+        return [(key, json.loads(result) if result else None, error) for key, result, error in rows]
+
+    def wait(self, batch, poll_interval=1.0, timeout=None, progress=None):
+        """Block until every job in the batch is done or failed; return the counts."""
+        started = time.monotonic()
+        while True:
+            # With every worker dead nobody else would expire the last leases
+            self.expire_leases()
+            counts = self.counts(batch)
+            if progress:
+                progress(counts)
+            if counts["queued"] == 0 and counts["leased"] == 0:
+                return counts
+            if timeout is not None and time.monotonic() - started > timeout:
+                raise TimeoutError(f"Batch {batch} still has {counts['queued'] + counts['leased']} open jobs")
+            time.sleep(poll_interval)
+
+    def purge(self, older_than_days=7):
+        """Delete finished jobs older than the cutoff."""
+        cutoff = time.time() - older_than_days * 86400
+        cursor = self.db.execute("DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?", (cutoff,))
+        return cursor.rowcount
+
+
+if __name__ == "__main__":
+    import sys
+
+    queue = JobQueue(sys.argv[1] if len(sys.argv) > 1 else QUEUE_PATH)
+    print(f"📬 {queue.path}: {queue.counts()}")
+    print(f"🧹 Purged {queue.purge()} finished jobs older than 7 days")
@@ -0,0 +1,311 @@
+import os
+import random
+import resource
+import tempfile
+import time
+import tracemalloc
+from collections import OrderedDict
+from datetime import date, timedelta
+
+import fitz  # PyMuPDF
+
+from scraper import metrics
+from scraper.mock_server import LISTING_PATH, start_mock_server
+
+TITLES = [
+    "Additions to the Entity List",
+    "Additions and Modifications to the Entity List",
+    "Revisions to License Exception {exc}",
+    "Export Administration Regulations: Technical Corrections",
+    "Implementation of Additional Export Controls: Certain Advanced Computing Items",
+    "Foreign-Produced Direct Product Rule Additions, and Refinements to Controls",
+    "Removal of Certain Entities From the Entity List",
+    "Wassenaar Arrangement {year} Plenary Decisions Implementation",
+]
+FILLER = (
+    "the of and to in for is that on by with as export item items license subject regulations "
+    "end use user foreign produced department commerce bureau industry security entity list "
+    "destination country requirement control controls paragraph section amendment rule final"
+).split()
+EXCEPTIONS = ["STA", "LVS", "GBS", "TSR", "ENC", "ACA", "NAC", "APP"]
+
+
+def random_eccn(rng):
+    return f"{rng.randint(0, 9)}{rng.choice('ABCDE')}{rng.randint(0, 999):03d}" + rng.choice(["", ".a", ".b", ".z"])
+
+
+def page_text(rng, words, eccn_density):
+    tokens = []
+    for _ in range(words):
+        if rng.random() < eccn_density:
+            tokens.append(random_eccn(rng))
+        else:
+            tokens.append(rng.choice(FILLER))
+    return " ".join(tokens)
+
+
+def build_pdf(pages, rng, eccn_density=0.01, words_per_page=600, regulatory_from=0.7):
+    """Build a rule-like PDF: preamble pages, then amendatory text and tables."""
+    doc = fitz.open()
+    first_regulatory = int(pages * regulatory_from)
+    for number in range(pages):
+        page = doc.new_page()
+        text = page_text(rng, words_per_page, eccn_density)
+        if number == first_regulatory:
+            text = "List of Subjects in 15 CFR Part 744 ... For the reasons stated in the preamble, " \
+                   "parts 744 and 774 of the EAR are amended as follows: PART 744—CONTROL POLICY " + text
+        elif number > first_regulatory and number % 3 == 0:
+            text = "Supplement No. 4 to Part 744—Entity List " + text
+        page.insert_textbox(fitz.Rect(36, 36, 576, 756), text, fontsize=7)
+    return doc.tobytes(deflate=True)
+
+
+class SyntheticCorpus:
+    """A deterministic synthetic Federal Register listing plus its PDFs.
+
+    PDF bodies are built from a small pool of templates, each stamped with
+    a per-document cover page so every URL has distinct content without
+    laying out every page of every document.
+    """
+
+    def __init__(self, notices=100, min_pages=5, max_pages=40, eccn_density=0.01,
+                 templates=8, seed=0, start=None):
+        self.rng = random.Random(seed)
+        self.eccn_density = eccn_density
+        start = start or date.today()
+        self.rows = []
+        for n in range(notices):
+            pub = start - timedelta(days=n // 3)
+            title = self.rng.choice(TITLES).format(exc=self.rng.choice(EXCEPTIONS), year=pub.year - 1)
+            self.rows.append({
+                "doc": f"{pub.year}-{n:05d}",
+                "pub_iso": pub.isoformat(),
+                "pub_date": pub.strftime("%m/%d/%Y"),
+                "eff_date": pub.strftime("%m/%d/%Y"),
+                "citation": f"{pub.year - 1935} FR {10000 + n * 7}",
+                "title": title,
+                "template": self.rng.randrange(templates),
+            })
+        self._by_doc = {row["doc"]: row for row in self.rows}
+        self.templates = [
+            build_pdf(self.rng.randint(min_pages, max_pages), random.Random(seed * 1000 + t), eccn_density)
+            for t in range(templates)
+        ]
+        self._pdf_cache = OrderedDict()
+        self._cache_size = 32
+
+    def pdf_bytes(self, doc_number):
+        """Return the PDF for a document number, or None if unknown."""
+        row = self._by_doc.get(doc_number)
+        if row is None:
+            return None
+        if doc_number in self._pdf_cache:
+            self._pdf_cache.move_to_end(doc_number)
+            return self._pdf_cache[doc_number]
+
+        rng = random.Random(doc_number)
+        with fitz.open(stream=self.templates[row["template"]], filetype="pdf") as doc:
+            cover = doc.new_page(pno=0)
+            cover.insert_textbox(fitz.Rect(36, 36, 576, 756),
+                                 f"{row['citation']} {row['title']} Document {doc_number}. "
+                                 + page_text(rng, 200, self.eccn_density), fontsize=8)
+            data = doc.tobytes(deflate=True)
+
+        self._pdf_cache[doc_number] = data
+        if len(self._pdf_cache) > self._cache_size:
+            self._pdf_cache.popitem(last=False)
+        return data
+
+
+def run_load_test(notices=500, min_pages=5, max_pages=40, eccn_density=0.01, latency=0.0,
+                  jitter=0.0, error_rate=0.0, workdir=None, browser=False, seed=0, regulus_args=()):
+    """Run regulus.main end to end against a mock server and report the numbers.
+
+    Without browser=True the rendered listing is fetched over plain HTTP and
+    recorded in the HTTP cache first, so no Chrome is needed. regulus_args
+    are passed on to regulus.main.
+
+    Returns:
+        Dict with throughput, latency percentiles, server stats and peak memory
+    """
+    import regulus
+    from scraper import http_cache
+
+    corpus = SyntheticCorpus(notices, min_pages, max_pages, eccn_density, seed=seed)
+    server = start_mock_server(corpus, latency=latency, jitter=jitter, error_rate=error_rate, seed=seed)
+    workdir = workdir or tempfile.mkdtemp(prefix="regulus_load_")
+    previous_cwd = os.getcwd()
+    previous_listing = regulus.BIS_LISTING_URL
+    try:
+        os.chdir(workdir)
+        regulus.BIS_LISTING_URL = server.base_url + LISTING_PATH
+        if not browser:
+            http_cache.store(regulus.BIS_LISTING_URL, server.listing_html(), {"Content-Type": "text/html"})
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        regulus.main(list(regulus_args))
+        elapsed = time.perf_counter() - started
+        _, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        run = metrics.summary()
+    finally:
+        regulus.BIS_LISTING_URL = previous_listing
+        os.chdir(previous_cwd)
+        server.stop()
+
+    server_latencies = [seconds for _, status, seconds in server.request_log]
+    return {
+        "notices": notices,
+        "elapsed_s": elapsed,
+        "throughput_notices_per_s": notices / elapsed if elapsed else None,
+        "notice_latency_s": run["timers"].get("notice.latency"),
+        "stages": {name: t["total"] for name, t in run["timers"].items() if name.startswith("stage.")},
+        "server_requests": len(server.request_log),
+        "server_errors": sum(1 for _, status, _ in server.request_log if status >= 400),
+        "server_latency_s": metrics.describe(server_latencies),
+        "traced_peak_mb": traced_peak / 1e6,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "workdir": workdir,
+    }
+
+
+def extract_rows_per_cell(driver):
+    """The original listing scrape (one WebDriver call per cell), kept as a baseline."""
+    import regulus
+    from selenium.webdriver.common.by import By
+
+    data = []
+    for row in driver.find_elements(By.CSS_SELECTOR, "table tbody tr"):
+        cols = row.find_elements(By.TAG_NAME, "td")
+        if len(cols) < 5:
+            continue
+        pdf_link = ""
+        try:
+            pdf_link = cols[5].find_element(By.TAG_NAME, "a").get_attribute("href")
+        except Exception:
+            pass
+        data.append(regulus.notice_from_cells(
+            cols[0].text.strip(), cols[1].text.strip(), cols[3].text.strip(), cols[4].text.strip(), pdf_link,
+        ))
+    return data
+
+
+def benchmark_listing(notices=300, repeat=3):
+    """Time the per-cell and the batched Selenium listing scrapes against the mock.
+
+    Needs Chrome and chromedriver. WebDriver commands are counted by
+    wrapping driver.execute, so the report shows round trips per row as
+    well as wall-clock time.
+    """
+    import regulus
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    corpus = SyntheticCorpus(notices, 1, 1, templates=1)
+    server = start_mock_server(corpus)
+    driver = regulus.setup_driver()
+    commands = [0]
+    execute = driver.execute
+
+    def counting_execute(*args, **kwargs):
+        commands[0] += 1
+        return execute(*args, **kwargs)
+
+    results = {}
+    try:
+        driver.get(server.base_url + LISTING_PATH)
+        WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr")))
+        driver.execute = counting_execute
+        methods = {
+            "per_cell": extract_rows_per_cell,
+            "execute_script": regulus.extract_listing_rows,
+            "page_source": lambda d: regulus.parse_listing_html(d.page_source),
+        }
+        records = {}
+        for name, method in methods.items():
+            timings = []
+            for _ in range(repeat):
+                commands[0] = 0
+                started = time.perf_counter()
+                records[name] = method(driver)
+                timings.append(time.perf_counter() - started)
+            best = min(timings)
+            results[name] = {
+                "rows": len(records[name]),
+                "seconds": best,
+                "ms_per_row": best * 1000 / max(1, len(records[name])),
+                "round_trips": commands[0],
+            }
+        baseline = [n.to_dict() for n in records["per_cell"]]
+        for name in methods:
+            results[name]["same_records"] = [n.to_dict() for n in records[name]] == baseline
+    finally:
+        driver.quit()
+        server.stop()
+    return results
+
+
+def print_report(result):
+    print("\n==== LOAD TEST ====")
+    print(f"Notices: {result['notices']} in {result['elapsed_s']:.1f}s "
+          f"→ {result['throughput_notices_per_s']:.1f} notices/s")
+    latency = result["notice_latency_s"]
+    if latency:
+        print(f"Per-notice latency: p50 {latency['p50'] * 1000:.0f} ms, "
+              f"p90 {latency['p90'] * 1000:.0f} ms, p99 {latency['p99'] * 1000:.0f} ms")
+    for name, total in result["stages"].items():
+        print(f"  {name}: {total:.2f}s")
+    server = result["server_latency_s"]
+    print(f"Server: {result['server_requests']} requests, {result['server_errors']} errors, "
+          f"p50 {(server['p50'] or 0) * 1000:.0f} ms, p99 {(server['p99'] or 0) * 1000:.0f} ms")
+    print(f"Peak memory: {result['traced_peak_mb']:.1f} MB traced, {result['max_rss_mb']:.0f} MB RSS")
+    print(f"Artifacts: {result['workdir']}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Synthetic-corpus load tests for the Regulus pipeline.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    listing = sub.add_parser("listing", help="benchmark Selenium listing extraction (needs Chrome)")
+    listing.add_argument("--notices", type=int, default=300)
+    listing.add_argument("--repeat", type=int, default=3)
+    for name in ("run", "serve"):
+        cmd = sub.add_parser(name)
+        cmd.add_argument("--notices", type=int, default=500)
+        cmd.add_argument("--min-pages", type=int, default=5)
+        cmd.add_argument("--max-pages", type=int, default=40)
+        cmd.add_argument("--eccn-density", type=float, default=0.01)
+        cmd.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+        cmd.add_argument("--jitter", type=float, default=0.0)
+        cmd.add_argument("--error-rate", type=float, default=0.0)
+        cmd.add_argument("--seed", type=int, default=0)
+    sub.choices["run"].add_argument("--workdir")
+    sub.choices["run"].add_argument("--browser", action="store_true", help="scrape the mock listing with Selenium")
+    sub.choices["run"].add_argument("--persist-pdfs", default="all", help="passed on to regulus.py")
+    sub.choices["serve"].add_argument("--port", type=int, default=8765)
+    sub.choices["serve"].add_argument("--page-size", type=int)
+    args = parser.parse_args()
+
+    if args.command == "listing":
+        print("\n==== LISTING EXTRACTION ====")
+        for name, r in benchmark_listing(args.notices, args.repeat).items():
+            print(f"{name:>15}: {r['rows']} rows in {r['seconds'] * 1000:.0f} ms "
+                  f"({r['ms_per_row']:.2f} ms/row, {r['round_trips']} WebDriver round trips, "
+                  f"same records: {r['same_records']})")
+    elif args.command == "serve":
+        corpus = SyntheticCorpus(args.notices, args.min_pages, args.max_pages, args.eccn_density, seed=args.seed)
+        server = start_mock_server(corpus, port=args.port, latency=args.latency, jitter=args.jitter,
+                                   error_rate=args.error_rate, page_size=args.page_size, seed=args.seed)
+        print(f"🧪 Mock BIS/govinfo at {server.base_url}{LISTING_PATH} (Ctrl-C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.stop()
+    else:
+        print_report(run_load_test(args.notices, args.min_pages, args.max_pages, args.eccn_density,
+                                   args.latency, args.jitter, args.error_rate, args.workdir,
+                                   args.browser, args.seed, ["--persist-pdfs", args.persist_pdfs]))
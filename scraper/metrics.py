@@ -0,0 +1,88 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+_lock = threading.Lock()
+_samples = defaultdict(list)
+_counters = defaultdict(int)
+_gauges = {}
+
+
+def reset():
+    """Forget everything recorded so far (start of a run)."""
+    with _lock:
+        _samples.clear()
+        _counters.clear()
+        _gauges.clear()
+
+
+def observe(name, value):
+    with _lock:
+        _samples[name].append(value)
+
+
+def incr(name, amount=1):
+    with _lock:
+        _counters[name] += amount
+
+
+def gauge(name, value):
+    with _lock:
+        _gauges[name] = value
+
+
+@contextmanager
+def timer(name):
+    """Record the wall-clock seconds spent in the block under name."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started)
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of values (q in 0–100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def describe(values):
+    return {
+        "count": len(values),
+        "total": sum(values),
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else None,
+    }
+
+
+def summary():
+    """Return all timers (with percentiles), counters and gauges."""
+    with _lock:
+        return {
+            "timers": {name: describe(values) for name, values in sorted(_samples.items())},
+            "counters": dict(sorted(_counters.items())),
+            "gauges": dict(sorted(_gauges.items())),
+        }
+
+
+def write_run_metrics(metrics_dir="data/metrics", extra=None, name="run"):
+    """Write the run's metrics as JSON and return the file path."""
+    os.makedirs(metrics_dir, exist_ok=True)
+    path = os.path.join(metrics_dir, f"{name}_{datetime.now():%Y-%m-%d_%H-%M-%S}.json")
+    payload = summary()
+    if extra:
+        payload.update(extra)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, default=str)
+    return path
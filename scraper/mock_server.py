@@ -0,0 +1,176 @@
+import hashlib
+import html
+import json
+import random
+import re
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+LISTING_PATH = "/news-updates/federal-register-notices"
+API_PATH = "/api/v1/documents.json"
+PDF_PATH = re.compile(r"^/content/pkg/FR-(\d{4}-\d{2}-\d{2})/pdf/([\w-]+)\.pdf$")
+
+
+class MockFederalRegisterServer(ThreadingHTTPServer):
+    """Local stand-in for the BIS listing table, the Federal Register
+    documents API and the govinfo PDF endpoints.
+
+    Every response is delayed by latency ± jitter seconds, and error_rate
+    of requests fail with a 503 or 429 so retry and back-off paths get
+    exercised.
+    """
+    daemon_threads = True
+
+    def __init__(self, corpus, host="127.0.0.1", port=0, latency=0.0, jitter=0.0,
+                 error_rate=0.0, page_size=None, seed=0):
+        super().__init__((host, port), MockRequestHandler)
+        self.corpus = corpus
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.page_size = page_size
+        self.rng = random.Random(seed)
+        self.request_log = []
+        self._log_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def record(self, path, status, seconds):
+        with self._log_lock:
+            self.request_log.append((path, status, seconds))
+
+    def pdf_url(self, row):
+        return f"{self.base_url}/content/pkg/FR-{row['pub_iso']}/pdf/{row['doc']}.pdf"
+
+    def listing_html(self, page=None):
+        rows = self.corpus.rows
+        if self.page_size:
+            page = page or 0
+            rows = rows[page * self.page_size:(page + 1) * self.page_size]
+        body = "".join(
+            "<tr>"
+            f"<td>{row['pub_date']}</td><td>{row['eff_date']}</td><td>{row['doc']}</td>"
+            f"<td>{row['citation']}</td><td>{html.escape(row['title'])}</td>"
+            f"<td><a href=\"{self.pdf_url(row)}\">PDF</a></td>"
+            "</tr>"
+            for row in rows
+        )
+        pager = ""
+        if self.page_size and (page + 1) * self.page_size < len(self.corpus.rows):
+            pager = f'<nav class="pager"><a rel="next" href="{LISTING_PATH}?page={page + 1}">Next</a></nav>'
+        return (
+            "<html><body><table><thead><tr><th>Publication</th><th>Effective</th>"
+            "<th>Document</th><th>Citation</th><th>Title</th><th>PDF</th></tr></thead>"
+            f"<tbody>{body}</tbody></table>{pager}</body></html>"
+        )
+
+    def api_json(self, query):
+        """Federal Register API style page of documents, oldest first."""
+        gte = query.get("conditions[publication_date][gte]", [""])[0]
+        lte = query.get("conditions[publication_date][lte]", ["9999"])[0]
+        per_page = int(query.get("per_page", ["20"])[0])
+        page = int(query.get("page", ["1"])[0])
+        rows = sorted((r for r in self.corpus.rows if gte <= r["pub_iso"] <= lte), key=lambda r: r["pub_iso"])
+        chunk = rows[(page - 1) * per_page:page * per_page]
+        next_page = None
+        if page * per_page < len(rows):
+            next_page = f"{self.base_url}{API_PATH}?page={page + 1}"
+        return json.dumps({
+            "count": len(rows),
+            "next_page_url": next_page,
+            "results": [
+                {
+                    "document_number": row["doc"],
+                    "title": row["title"],
+                    "type": "Rule",
+                    "publication_date": row["pub_iso"],
+                    "effective_on": row["pub_iso"],
+                    "citation": row["citation"],
+                    "pdf_url": self.pdf_url(row),
+                    "html_url": f"{self.base_url}/documents/{row['doc']}",
+                }
+                for row in chunk
+            ],
+        })
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def _respond(self, send_body):
+        server = self.server
+        started = time.perf_counter()
+        delay = max(0.0, server.latency + server.rng.uniform(-server.jitter, server.jitter))
+        if delay:
+            time.sleep(delay)
+
+        parsed = urlparse(self.path)
+        if server.error_rate and server.rng.random() < server.error_rate:
+            status, body, content_type = server.rng.choice([503, 429]), b"unavailable", "text/plain"
+        elif parsed.path == LISTING_PATH:
+            page = int(parse_qs(parsed.query).get("page", ["0"])[0])
+            status, body, content_type = 200, server.listing_html(page).encode("utf-8"), "text/html; charset=utf-8"
+        elif parsed.path == API_PATH:
+            body = server.api_json(parse_qs(parsed.query)).encode("utf-8")
+            status, content_type = 200, "application/json"
+        elif PDF_PATH.match(parsed.path):
+            doc = PDF_PATH.match(parsed.path).group(2)
+            pdf = server.corpus.pdf_bytes(doc)
+            if pdf is None:
+                status, body, content_type = 404, b"not found", "text/plain"
+            else:
+                status, body, content_type = 200, pdf, "application/pdf"
+        else:
+            status, body, content_type = 404, b"not found", "text/plain"
+
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            server.record(parsed.path, 304, time.perf_counter() - started)
+            return
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if status == 200:
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", formatdate(usegmt=True))
+        if status == 429:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+        server.record(parsed.path, status, time.perf_counter() - started)
+
+
+def start_mock_server(corpus, **kwargs):
+    """Start a MockFederalRegisterServer on a background thread."""
+    return MockFederalRegisterServer(corpus, **kwargs).start()
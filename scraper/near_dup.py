@@ -0,0 +1,230 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+INDEX_PATH = "data/state/near_dup_index.json"
+LINKS_PATH = "data/processed/duplicate_links.csv"
+LINK_COLUMNS = ["run_date", "url", "canonical_url", "similarity", "source", "title"]
+
+NUM_PERM = 128
+BANDS = 16            # 16 bands × 8 rows: pairs above ~0.7 Jaccard become candidates
+SHINGLE_WORDS = 5
+MIN_SHINGLES = 50     # titles alone are too short to fingerprint safely
+THRESHOLD = 0.85
+
+_TOKEN = re.compile(r"[a-z0-9§.]+")
+
+# Fixed seed so signatures stay comparable across runs
+_rng = np.random.default_rng(20250415)
+_A = _rng.integers(1, 2**63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2**63, NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text):
+    """Hash the overlapping word 5-grams of normalized text to 32-bit ints."""
+    words = _TOKEN.findall(text.lower())
+    grams = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(max(0, len(words) - SHINGLE_WORDS + 1))}
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(g.encode(), digest_size=4).digest(), "little") for g in grams),
+        dtype=np.uint64, count=len(grams),
+    )
+
+
+def minhash(text):
+    """MinHash signature of text, or None if it has too few shingles."""
+    hashed = shingles(text)
+    if len(hashed) < MIN_SHINGLES:
+        return None
+    # Multiply-shift hashing; uint64 overflow is the intended wrap-around
+    with np.errstate(over="ignore"):
+        permuted = (np.outer(_A, hashed) + _B[:, None]) >> np.uint64(32)
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(np.asarray(sig_a) == np.asarray(sig_b)))
+
+
+def _band_keys(signature):
+    rows = NUM_PERM // BANDS
+    return [f"{band}:{signature[band * rows:(band + 1) * rows].tobytes().hex()}" for band in range(BANDS)]
+
+
+class NearDuplicateIndex:
+    """MinHash signatures of every stored document plus their LSH buckets.
+
+    A new document only has to be compared with the documents that share
+    at least one band with it, so a lookup does not scan the history.
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        self.signatures = {}   # url → signature
+        self.canonical = {}    # url → canonical url (itself if original)
+        self.buckets = {}      # band key → [canonical urls]; duplicates are not bucketed
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        index = cls(path)
+        try:
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return index
+        index.canonical = state["canonical"]
+        for url, signature in state["signatures"].items():
+            signature = np.array(signature, dtype=np.uint32)
+            if index.canonical.get(url, url) == url:
+                index._insert(url, signature)
+            else:
+                index.signatures[url] = signature
+        return index
+
+    def save(self):
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            state = {
+                "signatures": {url: sig.tolist() for url, sig in self.signatures.items()},
+                "canonical": self.canonical,
+            }
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+
+    def _insert(self, url, signature):
+        self.signatures[url] = signature
+        for key in _band_keys(signature):
+            self.buckets.setdefault(key, []).append(url)
+
+    def candidates(self, signature):
+        found = set()
+        for key in _band_keys(signature):
+            found.update(self.buckets.get(key, ()))
+        return found
+
+    def link(self, url, text):
+        """Return (canonical_url, similarity) for a document, indexing it if new.
+
+        Documents without enough text are never linked.
+        """
+        with self._lock:
+            if url in self.canonical:
+                return self.canonical[url], self.similarity(url)
+
+        signature = minhash(text)
+        if signature is None:
+            return url, 1.0
+        return self.link_signature(url, signature)
+
+    def link_signature(self, url, signature):
+        """link() for a document fingerprinted elsewhere (e.g. by a queue worker)."""
+        signature = np.asarray(signature, dtype=np.uint32)
+        with self._lock:
+            if url in self.canonical:
+                return self.canonical[url], self.similarity(url)
+            best, best_score = None, 0.0
+            for other in self.candidates(signature):
+                score = similarity(signature, self.signatures[other])
+                if score > best_score:
+                    best, best_score = other, score
+            if best is not None and best_score >= THRESHOLD:
+                self.canonical[url] = best
+                self.signatures[url] = signature
+                return best, best_score
+            self.canonical[url] = url
+            self._insert(url, signature)
+            return url, 1.0
+
+    def similarity(self, url):
+        """Estimated similarity between a document and its canonical record."""
+        canonical = self.canonical.get(url, url)
+        if canonical == url or url not in self.signatures:
+            return 1.0
+        return similarity(self.signatures[url], self.signatures[canonical])
+
+
+class SignatureRecorder:
+    """Stands in for NearDuplicateIndex where the index cannot be shared.
+
+    Queue workers only fingerprint what they extract; the coordinator,
+    the single writer of the index, links the signatures afterwards.
+    link() therefore leaves canonical_url empty.
+    """
+
+    def __init__(self):
+        self.signatures = {}
+
+    def link(self, url, text):
+        signature = minhash(text)
+        if signature is not None:
+            self.signatures[url] = signature
+        return "", None
+
+
+def write_duplicate_links(df, index, links_path=LINKS_PATH):
+    """Append the notices linked to an existing canonical record.
+
+    Returns:
+        (originals, added): the rows of df that are originals (canonical_url
+        is their own URL or empty), i.e. what should be stored in the
+        master, and how many links were new (a notice still on the listing
+        is linked again on every run but written only once).
+    """
+    linked = df[(df["canonical_url"] != "") & (df["canonical_url"] != df["url"])]
+    added = 0
+    if not linked.empty:
+        os.makedirs(os.path.dirname(links_path) or ".", exist_ok=True)
+        links = pd.DataFrame({
+            "run_date": datetime.now().strftime("%Y-%m-%d"),
+            "url": linked["url"],
+            "canonical_url": linked["canonical_url"],
+            "similarity": [round(index.similarity(url), 3) for url in linked["url"]],
+            "source": linked["source"].astype(str),
+            "title": linked["title"],
+        }, columns=LINK_COLUMNS)
+        if os.path.exists(links_path):
+            known = pd.read_csv(links_path, usecols=["url"])["url"]
+            links = links[~links["url"].isin(known)]
+            links.to_csv(links_path, mode="a", header=False, index=False)
+        else:
+            links.to_csv(links_path, index=False)
+        added = len(links)
+    return df.drop(linked.index), added
+
+
+def rebuild(processed_dir="data/processed", path=INDEX_PATH):
+    """Fingerprint every stored notice whose PDF is still in the blob store."""
+    from scraper import pdf_store
+    from scraper.history import load_history
+    from scraper.sections import extract_relevant_pages
+
+    index = NearDuplicateIndex(path)
+    history = load_history(processed_dir=processed_dir).sort_values("date", na_position="last")
+    for row in history.itertuples(index=False):
+        text = row.title
+        if row.pdf_sha256 and pdf_store.blob_path(row.pdf_sha256):
+            pages, _, _ = extract_relevant_pages(pdf_store.read_blob(row.pdf_sha256))
+            text += "\n" + "\n".join(page for _, page in pages)
+        index.link(row.url, text)
+    index.save()
+    return index
+
+
+if __name__ == "__main__":
+    import sys
+
+    target = sys.argv[1] if len(sys.argv) > 1 else "data/processed"
+    index = rebuild(target)
+    duplicates = sum(1 for url, canonical in index.canonical.items() if url != canonical)
+    print(f"🧬 Indexed {len(index.signatures)} documents, {duplicates} near-duplicates → {index.path}")
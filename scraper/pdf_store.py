@@ -0,0 +1,225 @@
+import csv
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+
+INDEX_NAME = "index.json"
+COLD_AFTER_DAYS = 30
+
+# Serializes read-modify-write of the URL index between download threads
+_index_lock = threading.Lock()
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def _index_path(store_dir):
+    return os.path.join(store_dir, INDEX_NAME)
+
+
+def load_index(store_dir="data/blobs"):
+    """Load the URL → SHA-256 index, or an empty one."""
+    try:
+        with open(_index_path(store_dir), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"urls": {}}
+
+
+def save_index(index, store_dir="data/blobs"):
+    os.makedirs(store_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=store_dir, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, _index_path(store_dir))
+
+
+def _raw_path(sha, store_dir):
+    return os.path.join(store_dir, sha[:2], f"{sha}.pdf")
+
+
+def blob_path(sha, store_dir="data/blobs"):
+    """Return the on-disk path of a blob (raw or compressed), or None."""
+    if not sha:
+        return None
+    raw = _raw_path(sha, store_dir)
+    if os.path.exists(raw):
+        return raw
+    if os.path.exists(raw + ".gz"):
+        return raw + ".gz"
+    return None
+
+
+def lookup_url(url, store_dir="data/blobs"):
+    """Return the hash already stored for url, if its blob still exists."""
+    sha = load_index(store_dir)["urls"].get(url)
+    return sha if blob_path(sha, store_dir) else None
+
+
+def _index_url(url, sha, store_dir):
+    if url:
+        with _index_lock:
+            index = load_index(store_dir)
+            index["urls"][url] = sha
+            save_index(index, store_dir)
+
+
+def put_bytes(data, url=None, store_dir="data/blobs"):
+    """Store an in-memory document (bytes, bytearray or memoryview) and return its SHA-256.
+
+    The hash is taken in memory and the blob written once, straight to its
+    final name, so nothing is read back from disk.
+    """
+    sha = hashlib.sha256(data).hexdigest()
+    if not blob_path(sha, store_dir):
+        dest = _raw_path(sha, store_dir)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dest), suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, dest)
+    _index_url(url, sha, store_dir)
+    return sha
+
+
+def put_bytes_async(data, url=None, store_dir="data/blobs"):
+    """put_bytes on a shared background writer; returns a Future of the SHA-256.
+
+    data must stay unchanged until the future is done.
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="blob-writer")
+    return _writer.submit(put_bytes, data, url, store_dir)
+
+
+def read_blob(sha, store_dir="data/blobs"):
+    """Return the bytes of a blob, decompressing cold blobs transparently."""
+    path = blob_path(sha, store_dir)
+    if path is None:
+        raise FileNotFoundError(f"No blob stored for {sha}")
+    if path.endswith(".gz"):
+        with gzip.open(path, "rb") as f:
+            return f.read()
+    os.utime(path)  # mtime doubles as last-access time for compress_cold
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _iter_blobs(store_dir):
+    if not os.path.isdir(store_dir):
+        return
+    for prefix in os.listdir(store_dir):
+        shard = os.path.join(store_dir, prefix)
+        if len(prefix) != 2 or not os.path.isdir(shard):
+            continue
+        for name in os.listdir(shard):
+            if name.endswith(".pdf") or name.endswith(".pdf.gz"):
+                yield name.split(".", 1)[0], os.path.join(shard, name)
+
+
+def compress_cold(max_age_days=COLD_AFTER_DAYS, store_dir="data/blobs"):
+    """Gzip blobs that have not been read for max_age_days.
+
+    Returns:
+        Number of bytes saved
+    """
+    cutoff = time.time() - max_age_days * 86400
+    saved = 0
+    for _, path in list(_iter_blobs(store_dir)):
+        if path.endswith(".gz") or os.path.getmtime(path) > cutoff:
+            continue
+        tmp_path = path + ".gz.tmp"
+        with open(path, "rb") as src, gzip.open(tmp_path, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, path + ".gz")
+        saved += os.path.getsize(path) - os.path.getsize(path + ".gz")
+        os.remove(path)
+    return saved
+
+
+def gc(referenced, store_dir="data/blobs"):
+    """Delete blobs whose hash is not in referenced and drop stale URL entries.
+
+    Returns:
+        Number of blobs removed
+    """
+    referenced = set(referenced)
+    removed = 0
+    for sha, path in list(_iter_blobs(store_dir)):
+        if sha not in referenced:
+            os.remove(path)
+            removed += 1
+
+    index = load_index(store_dir)
+    index["urls"] = {url: sha for url, sha in index["urls"].items() if sha in referenced}
+    save_index(index, store_dir)
+    return removed
+
+
+def referenced_hashes(processed_dir="data/processed", links_path=None, queue_path=None, store_dir="data/blobs"):
+    """Hashes of every blob something still points at.
+
+    That is the master history, the near-duplicate links (those rows are
+    kept out of the master, so their blobs are found through the URL index)
+    and the job queue, whose payloads and results may not be merged yet.
+    """
+    from scraper.history import load_history
+    from scraper.job_queue import QUEUE_PATH
+    from scraper.near_dup import LINKS_PATH
+
+    links_path = links_path or LINKS_PATH
+    queue_path = queue_path or QUEUE_PATH
+    hashes = set(load_history(processed_dir=processed_dir, columns=["pdf_sha256"])["pdf_sha256"])
+    urls = set()
+    if os.path.exists(links_path):
+        with open(links_path, newline="", encoding="utf-8") as f:
+            urls.update(row["url"] for row in csv.DictReader(f))
+    if os.path.exists(queue_path):
+        with closing(sqlite3.connect(queue_path)) as db:
+            for payload, result in db.execute("SELECT payload, result FROM jobs"):
+                for document in (json.loads(payload), json.loads(result) if result else {}):
+                    notice = document.get("notice") or {}
+                    hashes.add(notice.get("pdf_sha256"))
+                    urls.add(notice.get("url"))
+    index = load_index(store_dir)["urls"]
+    hashes.update(index.get(url) for url in urls)
+    return {sha for sha in hashes if isinstance(sha, str) and sha}
+
+
+def disk_usage(store_dir="data/blobs"):
+    """Return (blob_count, total_bytes) for the store."""
+    count = total = 0
+    for _, path in _iter_blobs(store_dir):
+        count += 1
+        total += os.path.getsize(path)
+    return count, total
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Maintain the content-addressed PDF store.")
+    parser.add_argument("command", choices=["gc", "compress", "stats"])
+    parser.add_argument("--store", default="data/blobs")
+    parser.add_argument("--processed", default="data/processed")
+    parser.add_argument("--days", type=int, default=COLD_AFTER_DAYS)
+    args = parser.parse_args()
+
+    if args.command == "gc":
+        removed = gc(referenced_hashes(args.processed, store_dir=args.store), args.store)
+        print(f"🧹 Removed {removed} unreferenced blobs")
+    elif args.command == "compress":
+        saved = compress_cold(args.days, args.store)
+        print(f"🗜️ Compressed cold blobs, saved {saved / 1e6:.2f} MB")
+
+    count, total = disk_usage(args.store)
+    print(f"📦 {count} blobs, {total / 1e6:.2f} MB in {args.store}")
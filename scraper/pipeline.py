@@ -0,0 +1,190 @@
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable
+
+from scraper import metrics, profiling
+from scraper.schema import read_notices_csv, serialize_lists
+
+PIPELINE_DIR = "data/state/pipeline"
+
+
+def digest(data):
+    """Short SHA-256 of bytes or a JSON-serializable value."""
+    if not isinstance(data, bytes):
+        data = json.dumps(data, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def _source(obj):
+    try:
+        return inspect.getsource(obj)
+    except (OSError, TypeError):
+        # Functions defined at runtime (e.g. via exec) have no source file
+        code = getattr(obj, "__code__", None)
+        return repr((code.co_code, code.co_consts)) if code else repr(obj)
+
+
+def code_version(*objects):
+    """Hash the source of functions, classes or modules a stage depends on."""
+    return digest("\n".join(_source(obj) for obj in objects).encode("utf-8"))
+
+
+def file_digest(path):
+    """Hash of a file's contents, or None if it does not exist."""
+    try:
+        with open(path, "rb") as f:
+            return digest(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def frame_bytes(df):
+    return serialize_lists(df).to_csv(index=False, date_format="%Y-%m-%d").encode("utf-8")
+
+
+@dataclass
+class Stage:
+    """One step of the pipeline.
+
+    func is called with the outputs of the stages named in inputs, in
+    order. The stage is skipped, and its cached output reused, when the
+    hashes of those outputs, of the code listed in code and of config()
+    all match the last run. volatile stages (reading the outside world)
+    always run; their output hash still decides what runs after them.
+    output is "frame" (notices DataFrame), "json" or None (side effects only).
+    """
+    name: str
+    func: Callable
+    inputs: list = field(default_factory=list)
+    code: list = field(default_factory=list)
+    config: Callable = None
+    output: str = "frame"
+    volatile: bool = False
+
+
+class Pipeline:
+    """A small DAG of memoized stages, run in declaration order."""
+
+    def __init__(self, stages, state_dir=PIPELINE_DIR, explain=False):
+        self.stages = stages
+        self.state_dir = state_dir
+        self.explain = explain
+        self.manifest_path = os.path.join(state_dir, "manifest.json")
+        self.outputs = {}
+        self.hashes = {}
+        self.ran = {}
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save_manifest(self, manifest):
+        os.makedirs(self.state_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.state_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _output_path(self, stage):
+        suffix = {"frame": "csv", "json": "json"}[stage.output]
+        return os.path.join(self.state_dir, f"{stage.name}.{suffix}")
+
+    def _store_output(self, stage, value):
+        if stage.output is None:
+            return None
+        os.makedirs(self.state_dir, exist_ok=True)
+        data = frame_bytes(value) if stage.output == "frame" else json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+        fd, tmp_path = tempfile.mkstemp(dir=self.state_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._output_path(stage))
+        return digest(data)
+
+    def _load_output(self, stage):
+        if stage.output is None:
+            return None
+        path = self._output_path(stage)
+        if stage.output == "frame":
+            return read_notices_csv(path)
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _why(self, stage, previous, components):
+        if stage.volatile:
+            return "always runs (reads external sources)"
+        if previous is None:
+            return "no previous run"
+        if stage.output is not None and not os.path.exists(self._output_path(stage)):
+            return "cached output missing"
+        reasons = []
+        if previous["code"] != components["code"]:
+            reasons.append("code changed")
+        if previous["config"] != components["config"]:
+            reasons.append("config changed")
+        for name, value in components["inputs"].items():
+            if previous["inputs"].get(name) != value:
+                reasons.append(f"input '{name}' changed")
+        return ", ".join(reasons)
+
+    def output(self, name):
+        """A stage's output, reloaded from its cached file if it was spilled."""
+        if name not in self.outputs:
+            stage = next(s for s in self.stages if s.name == name)
+            self.outputs[name] = self._load_output(stage)
+        return self.outputs[name]
+
+    def _spill(self):
+        """Drop in-memory outputs that are already on disk (see output())."""
+        for stage in self.stages:
+            if stage.output is not None and stage.name in self.outputs:
+                del self.outputs[stage.name]
+
+    def run(self):
+        """Run every stage that is out of date and return {stage: output}."""
+        manifest = self._load_manifest()
+        for stage in self.stages:
+            if profiling.over_budget("pipeline"):
+                self._spill()
+            components = {
+                "code": code_version(*stage.code) if stage.code else None,
+                "config": digest(stage.config()) if stage.config else None,
+                "inputs": {name: self.hashes[name] for name in stage.inputs},
+            }
+            previous = manifest.get(stage.name)
+            reason = self._why(stage, previous, components)
+
+            if not reason:
+                self.outputs[stage.name] = self._load_output(stage)
+                self.hashes[stage.name] = previous["output"]
+                self.ran[stage.name] = False
+                metrics.incr("pipeline.skipped")
+                if self.explain:
+                    print(f"⏭️ {stage.name}: skipped (inputs, code and config unchanged)")
+                continue
+
+            if self.explain:
+                print(f"▶️ {stage.name}: running ({reason})")
+            with metrics.timer(f"stage.{stage.name}"), profiling.stage(stage.name):
+                value = stage.func(*(self.output(name) for name in stage.inputs))
+            output_hash = self._store_output(stage, value)
+            if stage.config:
+                # Config may describe the stage's own products (e.g. files it
+                # must create), so record it as it stands after the run.
+                components["config"] = digest(stage.config())
+            self.outputs[stage.name] = value
+            self.hashes[stage.name] = output_hash or digest(components)
+            self.ran[stage.name] = True
+            manifest[stage.name] = dict(
+                components, output=self.hashes[stage.name], reason=reason,
+                ran_at=datetime.now().isoformat(timespec="seconds"),
+            )
+            self._save_manifest(manifest)
+        return self.outputs
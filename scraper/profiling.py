@@ -0,0 +1,179 @@
+import gc
+import json
+import os
+import resource
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from scraper import metrics
+
+PROFILE_DIR = "data/metrics"
+
+_budget_mb = None
+_warned = set()
+_profiler = None
+_stage_memory = {}
+
+
+def rss_mb():
+    """Current resident set size of this process in MiB."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        # No procfs (macOS): fall back to the peak, which only overstates usage
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def set_memory_budget(megabytes):
+    """Set the RSS budget (MiB) stages degrade under; None disables it."""
+    global _budget_mb
+    _budget_mb = megabytes
+    _warned.clear()
+
+
+def over_budget(where, fraction=1.0):
+    """True if RSS is above fraction × the budget; collects garbage first.
+
+    Stages call this at natural checkpoints and switch to a cheaper mode
+    (smaller batches, spilling to disk) when it returns True.
+    """
+    if _budget_mb is None:
+        return False
+    limit = _budget_mb * fraction
+    if rss_mb() <= limit:
+        return False
+    gc.collect()
+    usage = rss_mb()
+    if usage <= limit:
+        return False
+    metrics.incr("memory.over_budget")
+    if where not in _warned:
+        print(f"🧠 {where}: RSS {usage:.0f} MiB over the {limit:.0f} MiB budget, degrading")
+        _warned.add(where)
+    return True
+
+
+class SamplingProfiler:
+    """Samples every thread's Python stack at a fixed interval.
+
+    Cheap enough to leave on for a whole run: one background thread reads
+    sys._current_frames() and counts collapsed stacks, which is what
+    flame-graph tools take as input.
+    """
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def top_functions(self, limit=25):
+        """Functions by share of samples where they were on top of the stack."""
+        own = Counter()
+        for stack, count in self.stacks.items():
+            own[stack.rsplit(";", 1)[-1]] += count
+        total = sum(own.values()) or 1
+        return [{"function": name, "samples": count, "share": round(count / total, 4)}
+                for name, count in own.most_common(limit)]
+
+
+def start_profiling(interval=0.01):
+    """Turn on tracemalloc and the sampling profiler for the rest of the run."""
+    global _profiler
+    tracemalloc.start()
+    _profiler = SamplingProfiler(interval).start()
+
+
+@contextmanager
+def stage(name):
+    """Record a stage's RSS change and, when profiling, its tracemalloc peak."""
+    rss_before = rss_mb()
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    try:
+        yield
+    finally:
+        rss_after = rss_mb()
+        metrics.gauge(f"memory.{name}.rss_mb", round(rss_after, 1))
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            _stage_memory[name] = {
+                "python_peak_mb": round(peak / 2**20, 2),
+                "python_current_mb": round(current / 2**20, 2),
+                "rss_before_mb": round(rss_before, 1),
+                "rss_after_mb": round(rss_after, 1),
+            }
+
+
+def stop_profiling(profile_dir=PROFILE_DIR):
+    """Stop profiling and write the run's profile artifacts.
+
+    Writes profile_<timestamp>.json (per-stage memory, top functions) and
+    profile_<timestamp>.folded (collapsed stacks for flamegraph.pl or
+    speedscope). Returns the JSON path, or None if profiling was off.
+    """
+    global _profiler
+    if _profiler is None:
+        return None
+    _profiler.stop()
+    top_allocations = []
+    if tracemalloc.is_tracing():
+        snapshot = tracemalloc.take_snapshot()
+        top_allocations = [
+            {"where": str(stat.traceback), "size_mb": round(stat.size / 2**20, 2), "count": stat.count}
+            for stat in snapshot.statistics("lineno")[:15]
+        ]
+        tracemalloc.stop()
+
+    os.makedirs(profile_dir, exist_ok=True)
+    base = os.path.join(profile_dir, f"profile_{datetime.now():%Y-%m-%d_%H-%M-%S}")
+    with open(base + ".folded", "w", encoding="utf-8") as f:
+        for stack, count in _profiler.stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        json.dump({
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "memory_budget_mb": _budget_mb,
+            "stages": _stage_memory,
+            "cpu_samples": _profiler.samples,
+            "sample_interval_s": _profiler.interval,
+            "top_functions": _profiler.top_functions(),
+            "top_allocations": top_allocations,
+        }, f, indent=2)
+    _profiler = None
+    return base + ".json"
@@ -0,0 +1,276 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import pandas as pd
+
+from scraper.aggregates import (
+    AGGREGATES_PATH, empty_aggregates, fold, keyword_summary, load_aggregates, source_month_summary,
+)
+from scraper.citation_graph import GRAPH_PATH, CitationGraph
+from scraper.history import list_partitions, load_history
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+def _jsonable(value):
+    if isinstance(value, pd.Timestamp):
+        return value.strftime("%Y-%m-%d")
+    if value is None or (not isinstance(value, list) and pd.isna(value)):
+        return None
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class Snapshot:
+    """Everything one build of the view serves, replaced as a whole on reload.
+
+    responses memoizes rendered responses for this snapshot only, so a
+    response rendered from an old snapshot can never be served after a
+    reload.
+    """
+    records: list
+    by_eccn: dict
+    eccn_names: dict
+    flagged: list
+    by_date: list
+    by_keyword: list
+    by_source_month: list
+    citations: CitationGraph
+    responses: dict = field(default_factory=dict)
+
+
+class MasterView:
+    """Read-optimized, in-memory view of the master history.
+
+    Records, an ECCN inverted index and the flagged subset are built once
+    per change of the partition files; the per-date, keyword and source
+    aggregates come straight from the materialized table kept by the
+    pipeline, and citation queries from the stored citation graph.
+    Each build is an immutable Snapshot swapped in with one assignment;
+    a request captures the current snapshot once and reads only from it.
+    The view never writes: until the pipeline has materialized the
+    aggregates they are counted in memory from the loaded history.
+    """
+
+    def __init__(self, processed_dir="data/processed", refresh_interval=30, aggregates_path=AGGREGATES_PATH,
+                 graph_path=GRAPH_PATH):
+        self.processed_dir = processed_dir
+        self.aggregates_path = aggregates_path
+        self.graph_path = graph_path
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._responses_lock = threading.Lock()
+        self._signature = None
+        self._checked_at = 0.0
+        self.snapshot = Snapshot([], {}, {}, [], [], [], [], CitationGraph(graph_path))
+
+    def _partition_signature(self):
+        signature = []
+        paths = [path for _, _, _, path in list_partitions(self.processed_dir)]
+        paths += [path for path in (self.aggregates_path, self.graph_path) if os.path.exists(path)]
+        for path in paths:
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def refresh(self, force=False):
+        """Rebuild the view if the partition files changed since the last build."""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.refresh_interval:
+            return
+        with self._lock:
+            self._checked_at = now
+            signature = self._partition_signature()
+            if signature == self._signature and not force:
+                return
+            df = load_history(processed_dir=self.processed_dir)
+            aggregates = load_aggregates(self.aggregates_path)
+            if aggregates is None or set(empty_aggregates()) - set(aggregates):
+                aggregates = fold(empty_aggregates(), df)
+            self.snapshot = Snapshot(
+                **self._build(df), **self._build_aggregates(aggregates), citations=CitationGraph.load(self.graph_path),
+            )
+            self._signature = signature
+
+    @staticmethod
+    def _build(df):
+        df = df.sort_values("date", ascending=False, na_position="last")
+        records = [
+            {key: _jsonable(value) for key, value in row.items()}
+            for row in df.to_dict("records")
+        ]
+        by_eccn = {}
+        eccn_names = {}
+        for idx, record in enumerate(records):
+            for eccn in record.get("eccns_found") or []:
+                by_eccn.setdefault(eccn.upper(), []).append(idx)
+                eccn_names.setdefault(eccn.upper(), eccn)
+        flagged = [idx for idx, record in enumerate(records) if record.get("flagged")]
+        return {"records": records, "by_eccn": by_eccn, "eccn_names": eccn_names, "flagged": flagged}
+
+    @staticmethod
+    def _build_aggregates(aggregates):
+        by_date = [
+            {
+                "publication_date": day,
+                "notices": count,
+                "flagged": aggregates["flagged_by_date"].get(day, 0),
+                "eccns": aggregates["eccns_by_date"].get(day, 0),
+            }
+            for day, count in sorted(aggregates["notices_by_date"].items(), reverse=True)
+            if day != "undated"
+        ]
+        by_keyword = [
+            {key: _jsonable(value) for key, value in row.items()}
+            for row in keyword_summary(aggregates).to_dict("records")
+        ]
+        by_source_month = [
+            {key: _jsonable(value) for key, value in row.items()}
+            for row in source_month_summary(aggregates).to_dict("records")
+        ]
+        return {"by_date": by_date, "by_keyword": by_keyword, "by_source_month": by_source_month}
+
+    def response(self, path, query):
+        """Return (status, body_bytes, etag) for an API path, memoized per snapshot."""
+        snapshot = self.snapshot
+        key = (path, tuple(sorted((k, tuple(v)) for k, v in query.items())))
+        with self._responses_lock:
+            cached = snapshot.responses.get(key)
+        if cached is not None:
+            return cached
+
+        status, payload = self._route(snapshot, path, query)
+        body = json.dumps(payload, default=str).encode("utf-8")
+        result = (status, body, f'"{hashlib.sha1(body).hexdigest()}"')
+        if status == 200:
+            with self._responses_lock:
+                if len(snapshot.responses) >= 1024:
+                    snapshot.responses.clear()
+                snapshot.responses[key] = result
+        return result
+
+    @staticmethod
+    def _page(snapshot, indices, query):
+        limit = min(int(query.get("limit", [DEFAULT_LIMIT])[0]), MAX_LIMIT)
+        offset = int(query.get("offset", ["0"])[0])
+        if offset < 0 or limit < 0:
+            raise ValueError("offset and limit must not be negative")
+        return {
+            "total": len(indices),
+            "offset": offset,
+            "limit": limit,
+            "items": [snapshot.records[i] for i in indices[offset:offset + limit]],
+        }
+
+    def _route(self, snapshot, path, query):
+        parts = [unquote(p) for p in path.strip("/").split("/") if p]
+        if parts == ["health"]:
+            return 200, {"status": "ok", "notices": len(snapshot.records)}
+        if parts == ["notices"]:
+            start = query.get("start", [None])[0]
+            end = query.get("end", [None])[0]
+            indices = range(len(snapshot.records))
+            if start or end:
+                indices = [
+                    i for i in indices
+                    if snapshot.records[i]["date"]
+                    and (not start or snapshot.records[i]["date"] >= start)
+                    and (not end or snapshot.records[i]["date"] <= end)
+                ]
+            return 200, self._page(snapshot, list(indices), query)
+        if parts == ["flagged"]:
+            return 200, self._page(snapshot, snapshot.flagged, query)
+        if len(parts) == 2 and parts[0] == "eccns":
+            indices = snapshot.by_eccn.get(parts[1].upper())
+            if not indices:
+                return 404, {"error": f"ECCN {parts[1]} not found"}
+            first_seen = min((snapshot.records[i]["date"] for i in indices if snapshot.records[i]["date"]), default=None)
+            return 200, dict(self._page(snapshot, indices, query), eccn=snapshot.eccn_names[parts[1].upper()], first_seen=first_seen)
+        if parts == ["eccns"]:
+            counts = sorted(((eccn, len(idx)) for eccn, idx in snapshot.by_eccn.items()), key=lambda x: (-x[1], x[0]))
+            return 200, {"total": len(counts), "items": [{"eccn": snapshot.eccn_names[e], "rules": n} for e, n in counts]}
+        if len(parts) == 2 and parts[0] == "citations":
+            node_id = snapshot.citations.resolve(parts[1])
+            if node_id is None:
+                return 404, {"error": f"{parts[1]} is not in the citation graph"}
+            describe = lambda ids: [snapshot.citations.describe(i) for i in ids]
+            return 200, dict(
+                snapshot.citations.describe(node_id),
+                cites=describe(snapshot.citations.references(node_id)),
+                amended_by=describe(snapshot.citations.amended_by(node_id, transitive="transitive" in query)),
+                corrections=describe(snapshot.citations.corrections(node_id)),
+            )
+        if parts == ["aggregates", "by-date"]:
+            return 200, {"total": len(snapshot.by_date), "items": snapshot.by_date}
+        if parts == ["aggregates", "keywords"]:
+            return 200, {"total": len(snapshot.by_keyword), "items": snapshot.by_keyword}
+        if parts == ["aggregates", "sources"]:
+            return 200, {"total": len(snapshot.by_source_month), "items": snapshot.by_source_month}
+        return 404, {"error": f"Unknown endpoint /{'/'.join(parts)}"}
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        view = self.server.view
+        try:
+            view.refresh()
+            status, body, etag = view.response(parsed.path, parse_qs(parsed.query))
+        except ValueError as e:
+            status, body, etag = 400, json.dumps({"error": str(e)}).encode("utf-8"), None
+
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "max-age=30")
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def make_server(processed_dir="data/processed", host="127.0.0.1", port=8080, refresh_interval=30):
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    server.daemon_threads = True
+    server.view = MasterView(processed_dir, refresh_interval)
+    server.view.refresh(force=True)
+    return server
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local JSON API over the Regulus master data.")
+    parser.add_argument("--processed", default="data/processed")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--refresh", type=int, default=30, help="seconds between checks for new master data")
+    args = parser.parse_args()
+
+    server = make_server(args.processed, args.host, args.port, args.refresh)
+    print(f"🛰️ Serving {len(server.view.snapshot.records)} notices at http://{args.host}:{args.port}/notices")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,195 @@
+import re
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+from scraper import metrics
+
+# First matching host pattern wins: (pattern, requests/s, max concurrency).
+# The starting point is deliberately polite; AIMD climbs from there.
+DEFAULT_LIMITS = [
+    (r"(^|\.)bis\.(?:doc\.)?gov$", 1.0, 2),
+    (r"(^|\.)federalregister\.gov$", 4.0, 4),
+    (r"(^|\.)govinfo\.gov$", 4.0, 8),
+    (r"", 4.0, 8),
+]
+
+THROTTLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _retry_after(value):
+    """Seconds to wait from a Retry-After header (delta or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostLimiter:
+    """Token bucket plus an AIMD concurrency window for one host.
+
+    Every request takes a token (refilled at `rate` per second, up to
+    `burst`) and an in-flight slot (at most `limit`). Fast, successful
+    responses grow the window by one slot per full window of successes and
+    the rate by a tenth of its starting value; a 429/5xx, a timeout or a
+    response slower than `target_latency` halves the window and cuts the
+    rate by 30%. Retry-After blocks the host outright.
+    """
+
+    def __init__(self, host, rate=4.0, max_concurrency=8, min_rate=0.2, max_rate=None,
+                 target_latency=2.0, burst=None):
+        self.host = host
+        self.rate = rate
+        self.rate_step = rate / 10
+        self.min_rate = min_rate
+        self.max_rate = max_rate or rate * 4
+        self.max_concurrency = max_concurrency
+        self.limit = float(max(1, max_concurrency // 2))
+        self.target_latency = target_latency
+        self.burst = burst or max(1.0, rate)
+        self.tokens = self.burst
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self._refilled_at = time.monotonic()
+        self._last_backoff = 0.0
+        self._cond = threading.Condition()
+        self._publish()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _publish(self):
+        metrics.gauge(f"ratelimit.{self.host}.rate", round(self.rate, 3))
+        metrics.gauge(f"ratelimit.{self.host}.concurrency", int(self.limit))
+
+    def acquire(self):
+        """Block until a token and an in-flight slot are free; return seconds waited."""
+        started = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.blocked_until and self.in_flight < int(self.limit) and self.tokens >= 1:
+                    self.tokens -= 1
+                    self.in_flight += 1
+                    break
+                if now < self.blocked_until:
+                    delay = self.blocked_until - now
+                elif self.tokens < 1:
+                    delay = (1 - self.tokens) / self.rate
+                else:
+                    delay = None  # wait for a release
+                self._cond.wait(delay)
+        waited = time.monotonic() - started
+        metrics.observe("ratelimit.wait", waited)
+        return waited
+
+    def release(self, status=None, latency=None, retry_after=None, error=False):
+        """Return the slot and adapt the limits to how the request went."""
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            throttled = error or status in THROTTLE_STATUSES
+            slow = latency is not None and latency > self.target_latency
+            if throttled or slow:
+                # At most one decrease per second (or round trip, if slower), so a
+                # burst of failures from one window does not collapse the limits.
+                if now - self._last_backoff > max(1.0, latency or 0):
+                    self.limit = max(1.0, self.limit / 2)
+                    self.rate = max(self.min_rate, self.rate * 0.7)
+                    self._last_backoff = now
+                    metrics.incr(f"ratelimit.{self.host}.backoffs")
+                if retry_after:
+                    self.blocked_until = max(self.blocked_until, now + retry_after)
+                    metrics.incr(f"ratelimit.{self.host}.retry_after")
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+                self.rate = min(self.max_rate, self.rate + self.rate_step)
+            self._publish()
+            self._cond.notify_all()
+
+    def snapshot(self):
+        with self._cond:
+            return {
+                "rate": self.rate,
+                "concurrency": int(self.limit),
+                "in_flight": self.in_flight,
+                "blocked_for": max(0.0, self.blocked_until - time.monotonic()),
+            }
+
+
+class Slot:
+    """Handle yielded by slot(); callers record the outcome on it."""
+
+    __slots__ = ("status", "retry_after")
+
+    def __init__(self):
+        self.status = None
+        self.retry_after = None
+
+    def record(self, response):
+        self.status = response.status_code
+        self.retry_after = _retry_after(response.headers.get("Retry-After"))
+
+
+_limiters = {}
+_registry_lock = threading.Lock()
+
+
+def limiter_for(url, limits=None):
+    """Return the shared limiter for the host of url (created on first use)."""
+    host = urlparse(url).hostname or ""
+    with _registry_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            for pattern, rate, concurrency in limits or DEFAULT_LIMITS:
+                if re.search(pattern, host):
+                    limiter = HostLimiter(host, rate, concurrency)
+                    break
+            _limiters[host] = limiter
+        return limiter
+
+
+@contextmanager
+def slot(url):
+    """Hold a rate-limited slot for one fetch of url.
+
+    Usage:
+        with rate_limit.slot(url) as s:
+            response = requests.get(url)
+            s.record(response)
+
+    An exception inside the block counts as a throttling signal.
+    """
+    limiter = limiter_for(url)
+    limiter.acquire()
+    handle = Slot()
+    started = time.monotonic()
+    try:
+        yield handle
+    except Exception:
+        limiter.release(latency=time.monotonic() - started, error=True)
+        raise
+    limiter.release(handle.status, time.monotonic() - started, handle.retry_after)
+
+
+def snapshot():
+    """Current limits for every host seen so far."""
+    with _registry_lock:
+        limiters = dict(_limiters)
+    return {host: limiter.snapshot() for host, limiter in limiters.items()}
+
+
+def reset():
+    """Forget learned limits (tests, or a new run in the same process)."""
+    with _registry_lock:
+        _limiters.clear()
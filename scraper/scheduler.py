@@ -0,0 +1,136 @@
+import heapq
+import json
+import os
+import threading
+from datetime import datetime
+
+from scraper import metrics
+
+ALERTS_PATH = "data/alerts/alerts.jsonl"
+
+# Title phrases and how urgently a notice carrying them should be looked at
+TITLE_WEIGHTS = {
+    "entity list": 100,
+    "huawei": 80,
+    "smic": 80,
+    "military end use": 60,
+    "military end user": 60,
+    "unverified list": 50,
+    "prc": 40,
+    "china": 30,
+    "advanced computing": 30,
+    "semiconductor": 30,
+    "interim final rule": 20,
+    "final rule": 10,
+    "correction": -20,
+}
+WATCHED_TITLE_WEIGHT = 50   # per watchlist term found in the title
+HIGH_PRIORITY = 50
+
+_alerts_lock = threading.Lock()
+
+
+def score(notice, watchlists=None):
+    """Cheap urgency score from the title alone, before any download."""
+    title = (notice.title or "").lower()
+    total = sum(weight for phrase, weight in TITLE_WEIGHTS.items() if phrase in title)
+    if watchlists is not None and len(watchlists):
+        total += WATCHED_TITLE_WEIGHT * len(watchlists.scan([notice.title]))
+    return total
+
+
+def in_priority_order(notices, watchlists=None, known=()):
+    """Yield (score, notice), highest score first, newest first among equals.
+
+    Notices whose URL is in known (already stored, still on the listing
+    page) come after every new one. Ties keep listing order, so a run
+    without high-priority notices processes them exactly as before.
+    """
+    heap = []
+    for position, notice in enumerate(notices):
+        published = notice.publication_date.timestamp() if notice.publication_date else 0.0
+        heapq.heappush(heap, (notice.url in known, -score(notice, watchlists), -published, position, notice))
+    while heap:
+        _, negated, _, _, notice = heapq.heappop(heap)
+        yield -negated, notice
+
+
+def detection_latency(notice, detected_at=None):
+    """Seconds from publication to now (publication dates are day-precision)."""
+    if not notice.publication_date:
+        return None
+    return ((detected_at or datetime.now()) - notice.publication_date).total_seconds()
+
+
+def load_alerted(path=ALERTS_PATH):
+    """URLs already alerted on, so a notice is announced once."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return {json.loads(line)["url"] for line in f if line.strip()}
+    except FileNotFoundError:
+        return set()
+
+
+def should_alert(notice, priority):
+    return priority >= HIGH_PRIORITY or bool(notice.watch_terms)
+
+
+def record_detection(notice, priority, alerted=None, path=ALERTS_PATH):
+    """Record a new notice's detection latency and alert if it warrants one.
+
+    Call it only the first time a URL is processed (not for stored notices
+    still on the listing page), or the latency histogram fills with stale
+    "detections".
+
+    Alerts are appended to the JSON-lines file and flushed immediately, so
+    a consumer tailing it sees each one as soon as its notice completes.
+    Appends are single short writes, so several processes can share the file.
+
+    Returns:
+        The alert dict, or None
+    """
+    detected_at = datetime.now()
+    latency = detection_latency(notice, detected_at)
+    if latency is not None:
+        metrics.observe("notice.detection_latency", latency)
+        metrics.observe(f"notice.detection_latency.{'high' if priority >= HIGH_PRIORITY else 'normal'}", latency)
+
+    if not should_alert(notice, priority) or (alerted is not None and notice.url in alerted):
+        return None
+    alert = {
+        "detected_at": detected_at.isoformat(timespec="seconds"),
+        "publication_date": notice.publication_date.strftime("%Y-%m-%d") if notice.publication_date else None,
+        "detection_latency_h": round(latency / 3600, 2) if latency is not None else None,
+        "priority": priority,
+        "citation": notice.citation,
+        "title": notice.title,
+        "url": notice.url,
+        "eccns": notice.eccns_found,
+        "watch_terms": notice.watch_terms,
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    line = json.dumps(alert) + "\n"
+    with _alerts_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+    if alerted is not None:
+        alerted.add(notice.url)
+    metrics.incr("alerts.sent")
+    print(f"🚨 Alert (priority {priority}): {notice.citation or ''} {notice.title}")
+    return alert
+
+
+if __name__ == "__main__":
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else ALERTS_PATH
+    try:
+        with open(path, encoding="utf-8") as f:
+            alerts = [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        alerts = []
+    print(f"🚨 {len(alerts)} alerts in {path}")
+    for alert in alerts[-20:]:
+        print(f"  {alert['detected_at']} · {alert['detection_latency_h']} h after publication · "
+              f"priority {alert['priority']} · {alert['title']}")
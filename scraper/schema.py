@@ -0,0 +1,158 @@
+import ast
+import json
+from dataclasses import asdict, dataclass, field, fields
+from datetime import datetime
+
+import pandas as pd
+
+SOURCES = [
+    "BIS Federal Register",
+    "BIS Recent Final Rules",
+    "DDTC/ITAR Updates",
+    "Federal Register Export Controls",
+]
+
+DATE_COLUMNS = ["publication_date", "effective_date", "date"]
+BOOL_COLUMNS = ["pdf_downloaded", "contains_eccn", "flagged"]
+LIST_COLUMNS = [
+    "eccns_found", "fr_citations", "cfr_sections", "ear_references",
+    "license_exceptions", "countries", "flagged_keywords", "watch_terms",
+]
+STRING_COLUMNS = ["citation", "title", "url", "pdf_path", "pdf_sha256", "canonical_url"]
+
+
+@dataclass(slots=True)
+class Notice:
+    """A single regulatory notice as it moves through the pipeline."""
+    source: str
+    publication_date: datetime | None = None
+    effective_date: datetime | None = None
+    citation: str = ""
+    title: str = ""
+    url: str = ""
+    date: datetime | None = None
+    pdf_downloaded: bool = False
+    pdf_path: str = ""
+    pdf_sha256: str = ""
+    contains_eccn: bool = False
+    eccn_count: int = 0
+    eccns_found: list[str] = field(default_factory=list)
+    fr_citations: list[str] = field(default_factory=list)
+    cfr_sections: list[str] = field(default_factory=list)
+    ear_references: list[str] = field(default_factory=list)
+    license_exceptions: list[str] = field(default_factory=list)
+    countries: list[str] = field(default_factory=list)
+    flagged_keywords: list[str] = field(default_factory=list)
+    flagged: bool = False
+    watch_terms: list[str] = field(default_factory=list)
+    canonical_url: str = ""
+
+    def to_dict(self):
+        return asdict(self)
+
+
+NOTICE_COLUMNS = [f.name for f in fields(Notice)]
+
+
+def parse_list(value):
+    """Turn a stored list cell back into a Python list.
+
+    Handles JSON lists, the stringified Python lists written by older runs
+    (e.g. "['Entity List']") and the comma-joined ECCN strings.
+    """
+    if isinstance(value, list):
+        return value
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return []
+    text = str(value).strip()
+    if not text:
+        return []
+    if text.startswith("["):
+        try:
+            return [str(v) for v in json.loads(text)]
+        except ValueError:
+            try:
+                return [str(v) for v in ast.literal_eval(text)]
+            except (ValueError, SyntaxError):
+                pass
+    return [part.strip() for part in text.split(",") if part.strip()]
+
+
+def _to_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    if value is None or pd.isna(value):
+        return False
+    return bool(value)
+
+
+def coerce_notices(df):
+    """Cast a notices DataFrame to the typed columnar schema.
+
+    source → category, dates → datetime64, flags → bool, eccn_count → int32
+    and keyword/ECCN columns → Python lists. Missing columns are added with
+    their default values so old CSVs load into the same shape.
+    """
+    df = df.copy()
+    for col in NOTICE_COLUMNS:
+        if col not in df.columns:
+            df[col] = [[] for _ in range(len(df))] if col in LIST_COLUMNS else None
+
+    df["source"] = pd.Categorical(df["source"], categories=sorted(set(SOURCES) | set(df["source"].dropna())))
+    for col in DATE_COLUMNS:
+        df[col] = pd.to_datetime(df[col], errors="coerce", format="mixed")
+    for col in BOOL_COLUMNS:
+        df[col] = df[col].map(_to_bool).astype(bool)
+    for col in STRING_COLUMNS:
+        df[col] = df[col].fillna("").astype("string")
+    df["eccn_count"] = pd.to_numeric(df["eccn_count"], errors="coerce").fillna(0).astype("int32")
+    for col in LIST_COLUMNS:
+        df[col] = df[col].map(parse_list)
+
+    extra = [c for c in df.columns if c not in NOTICE_COLUMNS]
+    return df[NOTICE_COLUMNS + extra]
+
+
+def notices_to_frame(notices):
+    """Build a typed DataFrame from a list of Notice records."""
+    df = pd.DataFrame([n.to_dict() for n in notices], columns=NOTICE_COLUMNS)
+    return coerce_notices(df)
+
+
+def frame_to_notices(df):
+    """Convert a typed DataFrame back into Notice records."""
+    records = []
+    for row in coerce_notices(df)[NOTICE_COLUMNS].to_dict("records"):
+        for col in DATE_COLUMNS:
+            row[col] = row[col].to_pydatetime() if pd.notna(row[col]) else None
+        records.append(Notice(**row))
+    return records
+
+
+def read_notices_csv(path, **kwargs):
+    """Read a notices CSV and return it in the typed schema."""
+    return coerce_notices(pd.read_csv(path, **kwargs))
+
+
+def serialize_lists(df):
+    """Return a copy of df with list columns encoded as JSON strings."""
+    df = df.copy()
+    for col in LIST_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].map(lambda v: json.dumps(parse_list(v)))
+    return df
+
+
+def write_notices_csv(df, path, **kwargs):
+    """Write a typed notices DataFrame so that it reads back unchanged."""
+    kwargs.setdefault("index", False)
+    serialize_lists(df).to_csv(path, date_format="%Y-%m-%d", **kwargs)
+
+
+def to_excel_frame(df):
+    """Flatten list columns to readable strings for the Excel workbook."""
+    df = df.copy()
+    for col in LIST_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].map(lambda v: ", ".join(parse_list(v)))
+    return df
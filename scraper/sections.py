@@ -0,0 +1,86 @@
+import re
+
+from scraper.extractors import DEFAULT_PATTERNS, compile_scanner, scan_text
+from scraper.utils import open_pdf
+
+# Where the regulatory text of a Federal Register rule begins. Everything
+# before it is preamble and regulatory analysis.
+REGULATORY_START = re.compile(r"List\s+of\s+Subjects\s+(?:in\s+)?\d+\s+CFR", re.IGNORECASE)
+
+OUTLINE_START = re.compile(r"List of Subjects|PART 7[3-7]\d|Supplement No", re.IGNORECASE)
+
+# A text-showing operator with its operand: (string) Tj, [(str) -20 (ing)] TJ, (string) ' or "
+_SHOW_TEXT = re.compile(rb"(\[(?:[^\]\\]|\\.)*\]|\((?:[^()\\]|\\.)*\))\s*(?:Tj|TJ|'|\")", re.DOTALL)
+# The kerning between two strings of a TJ array: ") -20 ("
+_KERN = re.compile(rb"\)\s*-?[\d.]*\s*\(")
+_RAW_START = re.compile(rb"\(List\s+of\s+Subjects", re.IGNORECASE)
+
+ECCN_SCANNER = compile_scanner({"eccn": DEFAULT_PATTERNS["eccn"]})
+
+
+def outline_start(doc):
+    """Return the first page of regulatory text according to the PDF outline."""
+    for _, title, page in doc.get_toc(simple=True):
+        if page > 0 and OUTLINE_START.search(title):
+            return page - 1
+    return None
+
+
+def _content(doc, page_no):
+    return b"".join(doc.xref_stream(xref) or b"" for xref in doc[page_no].get_contents())
+
+
+def raw_page_text(doc, page_no):
+    """Approximate text of a page read straight from its content stream.
+
+    GPO typesets Federal Register PDFs with literal-string text operators,
+    so the strings can be pulled out of the decompressed stream without
+    building a text page, which is several times cheaper than get_text().
+    Strings of one operator are joined as they are (TJ arrays split words
+    for kerning); separate operators are joined with a space. Escapes are
+    left as written. Pages whose text is hex- or CID-encoded come back empty.
+    """
+    shown = []
+    for operand in _SHOW_TEXT.findall(_content(doc, page_no)):
+        shown.append(_KERN.sub(b"", operand[1:-1]).strip(b"()") if operand[:1] == b"[" else operand[1:-1])
+    return b" ".join(shown).decode("latin-1")
+
+
+def extract_relevant_pages(source, full=False):
+    """Extract only the pages of a rule that carry regulatory text.
+
+    Phase one is cheap: it finds where the regulatory text starts from the
+    outline if the PDF has one, otherwise by searching the raw content
+    streams backwards for the "List of Subjects" heading, and collects the
+    ECCNs the preamble mentions from its raw text (see raw_page_text).
+    Phase two runs full get_text() on the first page (title and SUMMARY)
+    and the regulatory pages only. If
+    no marker is found, the preamble has no raw text to scan, or with
+    full=True, every page is extracted.
+
+    Returns:
+        (pages, page_count, preamble_eccns) where pages is a list of
+        (page_no, text) and preamble_eccns lists the ECCNs found on the
+        pages that were not extracted
+    """
+    with open_pdf(source) as doc:
+        page_count = len(doc)
+        everything = lambda: ([(n, page.get_text()) for n, page in enumerate(doc)], page_count, [])
+        if full or page_count <= 2:
+            return everything()
+
+        start = outline_start(doc)
+        if start is None:
+            # Walk back from the end for the last marker (the preamble may
+            # mention "List of Subjects" in passing); only raw bytes are read
+            start = next((n for n in range(page_count - 1, 0, -1) if _RAW_START.search(_content(doc, n))
+                          and REGULATORY_START.search(raw_page_text(doc, n))), None)
+        raw = {n: raw_page_text(doc, n) for n in range(1, start or 0)}
+        if not start or not any(text.strip() for text in raw.values()):
+            return everything()
+
+        preamble_eccns = {
+            hit.value for n, text in raw.items() for hit in scan_text(text, ECCN_SCANNER, n)
+        }
+        pages = [(n, doc[n].get_text()) for n in [0] + list(range(start, page_count))]
+        return pages, page_count, sorted(preamble_eccns)
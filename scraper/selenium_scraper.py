@@ -11,6 +11,13 @@ import os
 import time
 import re
 import requests
+import sys
+
+if __package__ in (None, ""):
+    # Run as `python scraper/selenium_scraper.py`: make the scraper package importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper import rate_limit
 
 def setup_driver():
     options = Options()
@@ -32,7 +39,9 @@ def download_pdf(url, folder="data/pdfs"):
         return None
         
     try:
-        response = requests.get(url, timeout=30)
+        with rate_limit.slot(url) as slot:
+            response = requests.get(url, timeout=30)
+            slot.record(response)
         if response.status_code == 200:
             path = os.path.join(folder, filename)
             with open(path, "wb") as f:
@@ -111,7 +120,8 @@ def fetch_bis_federal_register_notices():
     driver = setup_driver()
     
     try:
-        driver.get("https://www.bis.gov/news-updates/federal-register-notices")
+        with rate_limit.slot("https://www.bis.gov/news-updates/federal-register-notices"):
+            driver.get("https://www.bis.gov/news-updates/federal-register-notices")
         
         WebDriverWait(driver, 15).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, "table tbody tr"))
@@ -159,7 +169,8 @@ def fetch_bis_recent_final_rules():
     
     try:
         # Navigate to the recent final rules page
-        driver.get("https://www.bis.doc.gov/index.php/regulations/federal-register-notices#fr-recent-final")
+        with rate_limit.slot("https://www.bis.doc.gov/index.php/regulations/federal-register-notices#fr-recent-final"):
+            driver.get("https://www.bis.doc.gov/index.php/regulations/federal-register-notices#fr-recent-final")
         
         # Wait for the content to load
         WebDriverWait(driver, 10).until(
@@ -242,7 +253,8 @@ def fetch_ddtc_updates():
     # the webpage is deprecated!!
     try:
         # Navigate to the DDTC Updates page
-        driver.get("https://www.pmddtc.state.gov/ddtc_public")
+        with rate_limit.slot("https://www.pmddtc.state.gov/ddtc_public"):
+            driver.get("https://www.pmddtc.state.gov/ddtc_public")
         
         # Wait for the content to load
         WebDriverWait(driver, 10).until(
@@ -317,7 +329,8 @@ def fetch_federal_register_export_controls():
     # the webpage is deprecated!!
     try:
         # Navigate to the Federal Register Export Controls page
-        driver.get("https://www.federalregister.gov/export-controls")
+        with rate_limit.slot("https://www.federalregister.gov/export-controls"):
+            driver.get("https://www.federalregister.gov/export-controls")
         
         # Wait for the content to load
         WebDriverWait(driver, 15).until(
@@ -0,0 +1,270 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+from datetime import datetime
+from html import escape
+
+from scraper.citation_graph import document_number
+from scraper.history import list_partitions
+from scraper.pipeline import code_version, digest, file_digest
+from scraper.schema import frame_to_notices, read_notices_csv
+
+SITE_DIR = "data/site"
+SITE_STATE = "data/state/site.json"
+PAGE_SIZE = 100
+LATEST = 25
+
+STYLE = """body{font-family:system-ui,sans-serif;max-width:60rem;margin:2rem auto;padding:0 1rem;color:#222}
+table{border-collapse:collapse;width:100%}td,th{border-bottom:1px solid #ddd;padding:.3rem .5rem;text-align:left;vertical-align:top}
+.flag{color:#b00;font-weight:600}nav{margin:1rem 0}nav a{margin-right:1rem}dt{font-weight:600;margin-top:.6rem}"""
+
+
+def notice_slug(url):
+    """File name stem of a notice page: its FR document number, else a URL hash."""
+    return document_number(url) or hashlib.sha1(str(url).encode("utf-8")).hexdigest()[:12]
+
+
+def eccn_slug(eccn):
+    return re.sub(r"[^A-Za-z0-9.]", "_", eccn)
+
+
+def _write(path, html):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(html)
+    os.replace(tmp_path, path)
+
+
+def _layout(title, body, root):
+    return (f"<!doctype html>\n<html lang=\"en\"><head><meta charset=\"utf-8\"><title>{escape(title)}</title>"
+            f"<style>{STYLE}</style></head><body>\n"
+            f"<nav><a href=\"{root}index.html\">Home</a><a href=\"{root}quarters/index.html\">Quarters</a>"
+            f"<a href=\"{root}eccns/index.html\">ECCNs</a><a href=\"{root}notices/index.html\">All notices</a></nav>\n"
+            f"<h1>{escape(title)}</h1>\n{body}\n</body></html>\n")
+
+
+def _notice_rows(slugs, notices, root):
+    rows = []
+    for slug in slugs:
+        notice = notices[slug]
+        flag = f" <span class=\"flag\">{escape(', '.join(notice['flags']))}</span>" if notice["flags"] else ""
+        rows.append(f"<tr><td>{notice['date'] or 'undated'}</td><td>{escape(notice['citation'] or '')}</td>"
+                    f"<td><a href=\"{root}notices/{slug}.html\">{escape(notice['title'] or slug)}</a>{flag}</td>"
+                    f"<td>{len(notice['eccns'])}</td></tr>")
+    return ("<table><tr><th>Date</th><th>Citation</th><th>Title</th><th>ECCNs</th></tr>\n"
+            + "\n".join(rows) + "\n</table>")
+
+
+def _paged(base, title, items, render, root="../"):
+    """Pages of items under base: base-1.html (oldest), base-2.html, ... and base.html (last).
+
+    Pages are cut from the start of the list, so appending items only
+    changes the last page (and, when it fills up, moves it to base-N.html);
+    links to a list always land on its newest entries.
+    """
+    chunks = [items[i:i + PAGE_SIZE] for i in range(0, len(items), PAGE_SIZE)] or [[]]
+    name = os.path.basename(base)
+    page_name = lambda number: f"{name}.html" if number == len(chunks) else f"{name}-{number}.html"
+    pages = {}
+    for number, chunk in enumerate(chunks, 1):
+        links = []
+        if number > 1:
+            links.append(f"<a href=\"{page_name(number - 1)}\">← Previous</a>")
+        # Totals only on the last page, so earlier pages stay byte-identical as the list grows
+        links.append(f"Page {number} of {len(chunks)} · {len(items)} entries" if number == len(chunks) else f"Page {number}")
+        if number < len(chunks):
+            links.append(f"<a href=\"{page_name(number + 1)}\">Next →</a>")
+        pager = f"<p>{' '.join(links)}</p>"
+        pages[os.path.join(os.path.dirname(base), page_name(number))] = _layout(
+            title, f"{pager}\n{render(chunk, root)}\n{pager}", root)
+    return pages
+
+
+def _list_base(page):
+    """The list a paged page belongs to ("eccns/3A090" for eccns/3A090-2.html), or None for notice pages."""
+    if not page.startswith(("quarters/", "eccns/", "notices/index")):
+        return None
+    return re.sub(r"(-\d+)?\.html$", "", page)
+
+
+def _dated(slugs, notices):
+    """Oldest first, so page boundaries stay put as notices are added."""
+    return sorted(slugs, key=lambda slug: (notices[slug]["date"] or "9999", slug))
+
+
+def _newest_first(render):
+    return lambda chunk, root: render(chunk[::-1], root)
+
+
+def _notice_page(notice):
+    def listing(values, link=None):
+        if not values:
+            return "—"
+        return ", ".join(link(v) if link else escape(v) for v in values)
+
+    eccn_link = lambda eccn: f"<a href=\"../eccns/{eccn_slug(eccn)}.html\">{escape(eccn)}</a>"
+    fields = [
+        ("Citation", escape(notice.citation or "—")),
+        ("Published", notice.publication_date.strftime("%Y-%m-%d") if notice.publication_date else "—"),
+        ("Effective", notice.effective_date.strftime("%Y-%m-%d") if notice.effective_date else "—"),
+        ("Source", escape(notice.source or "—")),
+        ("PDF", f"<a href=\"{escape(notice.url)}\">{escape(notice.url)}</a>" if notice.url else "—"),
+        ("ECCNs", listing(notice.eccns_found, eccn_link)),
+        ("Flagged keywords", listing(notice.flagged_keywords)),
+        ("Watched terms", listing(notice.watch_terms)),
+        ("Countries", listing(notice.countries)),
+        ("License exceptions", listing(notice.license_exceptions)),
+        ("CFR sections", listing(notice.cfr_sections)),
+        ("FR citations", listing(notice.fr_citations)),
+        ("PDF SHA-256", escape(notice.pdf_sha256 or "—")),
+    ]
+    if notice.canonical_url and notice.canonical_url != notice.url:
+        fields.append(("Duplicate of", f"<a href=\"{notice_slug(notice.canonical_url)}.html\">{escape(notice.canonical_url)}</a>"))
+    body = "<dl>\n" + "\n".join(f"<dt>{name}</dt><dd>{value}</dd>" for name, value in fields) + "\n</dl>"
+    return _layout(notice.title or notice.url, body, "../")
+
+
+def _summary(notice, quarter):
+    return {
+        "quarter": quarter,
+        "date": notice.publication_date.strftime("%Y-%m-%d") if notice.publication_date else None,
+        "citation": notice.citation,
+        "title": notice.title,
+        "eccns": notice.eccns_found,
+        "flags": notice.flagged_keywords,
+        "digest": digest(notice.to_dict()),
+    }
+
+
+def site_code_version():
+    return code_version(_layout, _notice_rows, _paged, _notice_page, _summary, build_site)
+
+
+def build_site(processed_dir="data/processed", site_dir=SITE_DIR, state_path=SITE_STATE):
+    """Bring the static HTML site in line with the master partitions.
+
+    Only partitions whose CSV changed since the last build are read. Their
+    notices are compared with the stored per-notice summaries to find what
+    was added, changed or removed, and only those notices' pages, their
+    quarters' and ECCNs' pages and the indexes are re-rendered. A page is
+    written (atomically) only when its content differs from the last
+    build, so a run adding two notices touches a handful of files. A
+    change to the page code rebuilds everything.
+
+    Returns:
+        (written, removed) counts of pages
+    """
+    try:
+        with open(state_path, encoding="utf-8") as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        state = {}
+    code = site_code_version()
+    if state.get("code") != code or not os.path.isdir(site_dir):
+        state = {"code": code}
+    partitions, notices, pages = state.get("partitions", {}), state.get("notices", {}), state.get("pages", {})
+
+    rendered = {}
+    dirty_quarters, dirty_eccns = set(), set()
+    on_disk = {}
+    for label, _, _, path in list_partitions(processed_dir):
+        quarter = label or "undated"
+        on_disk[quarter] = file_digest(path)
+        if partitions.get(quarter) == on_disk[quarter]:
+            continue
+        dirty_quarters.add(quarter)
+        seen = set()
+        for notice in frame_to_notices(read_notices_csv(path)):
+            slug = notice_slug(notice.url)
+            seen.add(slug)
+            summary = _summary(notice, quarter)
+            previous = notices.get(slug)
+            if previous and previous["digest"] == summary["digest"] and previous["quarter"] == quarter:
+                continue
+            if previous:
+                dirty_quarters.add(previous["quarter"])
+                dirty_eccns.update(previous["eccns"])
+            dirty_eccns.update(summary["eccns"])
+            notices[slug] = summary
+            rendered[f"notices/{slug}.html"] = _notice_page(notice)
+        for slug in [s for s, n in notices.items() if n["quarter"] == quarter and s not in seen]:
+            dirty_eccns.update(notices.pop(slug)["eccns"])
+
+    for quarter in set(partitions) - set(on_disk):
+        dirty_quarters.add(quarter)
+        for slug in [s for s, n in notices.items() if n["quarter"] == quarter]:
+            dirty_eccns.update(notices.pop(slug)["eccns"])
+
+    if dirty_quarters or dirty_eccns or not pages:
+        by_quarter, by_eccn = {}, {}
+        for slug, notice in notices.items():
+            by_quarter.setdefault(notice["quarter"], []).append(slug)
+            for eccn in notice["eccns"]:
+                by_eccn.setdefault(eccn, []).append(slug)
+        rows = lambda chunk, root: _notice_rows(chunk, notices, root)
+        for quarter in dirty_quarters & set(by_quarter):
+            rendered.update(_paged(f"quarters/{quarter}", f"Notices {quarter.replace('_', ' ')}",
+                                   _dated(by_quarter[quarter], notices), _newest_first(rows)))
+        for eccn in dirty_eccns & set(by_eccn):
+            rendered.update(_paged(f"eccns/{eccn_slug(eccn)}", f"ECCN {eccn}",
+                                   _dated(by_eccn[eccn], notices), _newest_first(rows)))
+
+        def quarter_rows(chunk, root):
+            return "<table><tr><th>Quarter</th><th>Notices</th></tr>\n" + "\n".join(
+                f"<tr><td><a href=\"{q}.html\">{q.replace('_', ' ')}</a></td><td>{len(by_quarter[q])}</td></tr>"
+                for q in chunk) + "\n</table>"
+
+        def eccn_rows(chunk, root):
+            return "<table><tr><th>ECCN</th><th>Notices</th></tr>\n" + "\n".join(
+                f"<tr><td><a href=\"{eccn_slug(e)}.html\">{escape(e)}</a></td><td>{len(by_eccn[e])}</td></tr>"
+                for e in chunk) + "\n</table>"
+
+        everything = _dated(notices, notices)
+        rendered.update(_paged("quarters/index", "Quarters", sorted(by_quarter, reverse=True), quarter_rows))
+        rendered.update(_paged("eccns/index", "ECCNs", sorted(by_eccn), eccn_rows))
+        rendered.update(_paged("notices/index", "All notices", everything, _newest_first(rows)))
+        latest = everything[-LATEST:][::-1]
+        rendered["index.html"] = _layout("BIS regulatory notices", (
+            f"<p>{len(notices)} notices in {len(by_quarter)} quarters mentioning {len(by_eccn)} ECCNs.</p>\n"
+            f"<h2>Latest</h2>\n{_notice_rows(latest, notices, '')}"), "")
+
+        # Pages of lists that shrank or vanished, and of removed notices
+        lists = {f"quarters/{q}" for q in by_quarter} | {f"eccns/{eccn_slug(e)}" for e in by_eccn}
+        lists |= {"quarters/index", "eccns/index", "notices/index"}
+        stale = [page for page in pages if page not in rendered and (
+            _list_base(page) is not None and (_list_base(page) not in lists or f"{_list_base(page)}.html" in rendered)
+            or _list_base(page) is None and page.startswith("notices/") and page[8:-5] not in notices)]
+    else:
+        stale = []
+
+    written = 0
+    for page, html in rendered.items():
+        key = digest(html.encode("utf-8"))
+        if pages.get(page) == key and os.path.exists(os.path.join(site_dir, page)):
+            continue
+        _write(os.path.join(site_dir, page), html)
+        pages[page] = key
+        written += 1
+    for page in set(stale):
+        pages.pop(page, None)
+        try:
+            os.remove(os.path.join(site_dir, page))
+        except FileNotFoundError:
+            pass
+
+    state.update(partitions=on_disk, notices=notices, pages=pages, built=datetime.now().isoformat(timespec="seconds"))
+    _write(state_path, json.dumps(state))
+    return written, len(set(stale))
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--rebuild" in sys.argv and os.path.exists(SITE_STATE):
+        os.remove(SITE_STATE)
+    written, removed = build_site()
+    print(f"🌐 Site: {written} pages written, {removed} removed → {SITE_DIR}/index.html")
@@ -1,2 +1,42 @@
 # Future: helpers for saving JSON, validating URLs, cleaning text, etc.
 
+import re
+
+import fitz  # PyMuPDF
+
+# Running headers/footers that govinfo prints on every Federal Register page
+FR_PAGE_NOISE = re.compile(
+    r"^\s*(?:\d+\s*)?Federal Register\s*/\s*Vol\.|^\s*VerDate\s|^\s*\w+ on \w+ with RULES\d*\s*$",
+    re.IGNORECASE,
+)
+
+
+def open_pdf(source):
+    """Open a PDF from a path or from raw bytes."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        # PyMuPDF reads buffers in place; no copy is needed
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
+
+
+def extract_pdf_pages(source):
+    """Return the plain text of every page of a PDF."""
+    with open_pdf(source) as doc:
+        return [page.get_text() for page in doc]
+
+
+def extract_pdf_blocks(source):
+    """Return the text blocks of a PDF in reading order, minus page furniture.
+
+    Each block is roughly one paragraph or one column fragment of a
+    paragraph; callers that need whole paragraphs should merge them.
+    """
+    blocks = []
+    with open_pdf(source) as doc:
+        for page in doc:
+            for block in page.get_text("blocks", sort=False):
+                text = block[4]
+                if block[6] != 0 or not text.strip() or FR_PAGE_NOISE.search(text):
+                    continue
+                blocks.append(text)
+    return blocks
@@ -0,0 +1,183 @@
+import json
+import os
+import re
+from datetime import datetime
+
+import pandas as pd
+
+from scraper.schema import parse_list
+
+WATCHLISTS_PATH = "data/watchlists.json"
+RESULTS_DIR = "data/processed/watchlists"
+
+# Watchlist keys and what kind of term each holds
+TERM_KINDS = {"eccns": "eccn", "entities": "entity", "countries": "country", "phrases": "phrase"}
+RESULT_COLUMNS = ["run_date", "publication_date", "citation", "title", "url", "matched_terms"]
+
+
+def term_key(term):
+    """Case- and whitespace-insensitive key a term is indexed under."""
+    return " ".join(str(term).split()).casefold()
+
+
+def _term_pattern(term, kind):
+    pattern = r"\s+".join(re.escape(word) for word in term.split())
+    if kind == "eccn":
+        # "3A090" also matches the paragraphs "3A090.a", "3A090.a.1", ...
+        pattern += r"(?:\.[a-z0-9]+)*"
+    return pattern
+
+
+def _first_word(key):
+    match = re.match(r"§?\s*(\w*)", key)
+    return match.group(1)
+
+
+def _safe_name(name):
+    return re.sub(r"[^\w.-]+", "_", name).strip("_") or "watchlist"
+
+
+class WatchlistIndex:
+    """All teams' watchlists compiled into one reverse index and one regex.
+
+    A document is scanned once for the union of every watched term; each
+    term found is then fanned out to the subscriptions that watch it, so the
+    cost of a notice does not grow with the number of subscriptions.
+    """
+
+    def __init__(self, subscriptions):
+        self.subscriptions = {}
+        self.index = {}       # term key → [subscription names]
+        self.display = {}     # term key → term as first written
+        kinds = {}
+        for sub in subscriptions:
+            name = _safe_name(sub["name"])
+            self.subscriptions[name] = sub
+            for list_key, kind in TERM_KINDS.items():
+                for term in sub.get(list_key, []):
+                    key = term_key(term)
+                    if not key:
+                        continue
+                    self.display.setdefault(key, " ".join(str(term).split()))
+                    kinds.setdefault(key, kind)
+                    if name not in self.index.setdefault(key, []):
+                        self.index[key].append(name)
+
+        self.scanner = None
+        self.nested = {}      # term key → keys of shorter watched terms inside it
+        if self.index:
+            patterns = {key: _term_pattern(self.display[key], kinds[key]) for key in self.index}
+            # Longest first so "Huawei Technologies" wins over "Huawei" at the same start;
+            # the lookahead lets a match begin at every word, so overlapping terms are found
+            alternatives = "|".join(patterns[key] for key in sorted(self.index, key=len, reverse=True))
+            self.scanner = re.compile(rf"(?<!\w)(?=[\w§])(?=((?:{alternatives})(?!\w)))", re.IGNORECASE)
+            # Shorter terms starting where a longer one does ("Huawei" in
+            # "Huawei Technologies") are never tried, so they are looked up
+            # here. Such a term shares the longer term's first word, so only
+            # terms with the same first word are compared.
+            by_first_word = {}
+            for key in self.index:
+                by_first_word.setdefault(_first_word(key), []).append(key)
+            for group in by_first_word.values():
+                if len(group) < 2:
+                    continue
+                single = {key: re.compile(rf"^(?:{patterns[key]})(?!\w)", re.IGNORECASE) for key in group}
+                for key in group:
+                    inside = [other for other in group
+                              if len(other) < len(key) and single[other].match(self.display[key])]
+                    if inside:
+                        self.nested[key] = inside
+
+    def __len__(self):
+        return len(self.subscriptions)
+
+    def scan(self, texts):
+        """Return the watched terms found in texts, in display form."""
+        found = set()
+        if self.scanner is None:
+            return []
+        for text in texts:
+            for match in self.scanner.finditer(text or ""):
+                key = term_key(match.group(1))
+                # Try "3a090.a.1", then "3a090.a", then "3a090"
+                while True:
+                    if key in self.index:
+                        found.add(self.display[key])
+                        found.update(self.display[other] for other in self.nested.get(key, []))
+                    if "." not in key:
+                        break
+                    key = key.rsplit(".", 1)[0]
+        return sorted(found)
+
+    def fan_out(self, terms):
+        """Map watched terms to {subscription name: [terms it matched]}."""
+        matches = {}
+        for term in terms:
+            for name in self.index.get(term_key(term), []):
+                matches.setdefault(name, []).append(term)
+        return matches
+
+
+def load_watchlists(path=WATCHLISTS_PATH):
+    """Load and compile the subscriptions file.
+
+    The file looks like:
+        {"subscriptions": [{"name": "ai-compute", "team": "Product Compliance",
+                            "eccns": ["3A090", "4A090"], "entities": ["SMIC"],
+                            "countries": ["China"], "phrases": ["model weights"]}]}
+
+    A missing file yields an empty index.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        config = {"subscriptions": []}
+    return WatchlistIndex(config.get("subscriptions", []))
+
+
+def write_subscription_results(df, index, results_dir=RESULTS_DIR):
+    """Append each subscription's newly matched notices to its own CSV.
+
+    Notices already listed for a subscription (same URL) are not repeated.
+
+    Returns:
+        Dict of subscription name → DataFrame of the rows added this run
+    """
+    per_subscription = {}
+    for row in df.itertuples(index=False):
+        for name, terms in index.fan_out(parse_list(row.watch_terms)).items():
+            per_subscription.setdefault(name, []).append({
+                "run_date": datetime.now().strftime("%Y-%m-%d"),
+                "publication_date": row.publication_date.strftime("%Y-%m-%d") if pd.notna(row.publication_date) else "",
+                "citation": row.citation,
+                "title": row.title,
+                "url": row.url,
+                "matched_terms": ", ".join(terms),
+            })
+
+    added = {}
+    if not per_subscription:
+        return added
+    os.makedirs(results_dir, exist_ok=True)
+    for name, rows in per_subscription.items():
+        path = os.path.join(results_dir, f"{name}.csv")
+        new_rows = pd.DataFrame(rows, columns=RESULT_COLUMNS).drop_duplicates(subset=["url"])
+        if os.path.exists(path):
+            known = pd.read_csv(path, usecols=["url"])["url"]
+            new_rows = new_rows[~new_rows["url"].isin(known)]
+            new_rows.to_csv(path, mode="a", header=False, index=False)
+        else:
+            new_rows.to_csv(path, index=False)
+        if not new_rows.empty:
+            added[name] = new_rows
+    return added
+
+
+if __name__ == "__main__":
+    import sys
+
+    index = load_watchlists(sys.argv[1] if len(sys.argv) > 1 else WATCHLISTS_PATH)
+    print(f"👥 {len(index)} subscriptions watching {len(index.index)} distinct terms")
+    for term, names in sorted(index.index.items(), key=lambda kv: -len(kv[1]))[:20]:
+        print(f"  {index.display[term]}: {', '.join(names)}")
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+import regulus
+from scraper.pipeline import Pipeline, Stage
+from scraper.schema import Notice, notices_to_frame
+
+
+def _notice(n, day):
+    url = f"https://www.govinfo.gov/content/pkg/FR-2025-01-{day:02d}/pdf/2025-{n:05d}.pdf"
+    return Notice(source="BIS Federal Register", citation=f"90 FR {n}", title=f"Rule {n}", url=url,
+                  publication_date=datetime(2025, 1, day), date=datetime(2025, 1, day), canonical_url=url)
+
+
+def test_report_runs_again_after_inserts_into_the_same_quarter(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    batches = [[_notice(1, 6)], [_notice(1, 6), _notice(2, 9), _notice(3, 13)]]
+    reports = []
+
+    def run(batch):
+        Pipeline([
+            Stage("flag", lambda: notices_to_frame(batch), volatile=True),
+            Stage("master", regulus.master_stage, inputs=["flag"], code=[regulus.master_stage], output="json"),
+            Stage("report", reports.append, inputs=["master"], output=None),
+        ], state_dir="data/state/pipeline").run()
+
+    for batch in batches:
+        run(batch)
+    assert len(reports) == 2
+    assert reports[0]["partitions"].keys() == reports[1]["partitions"].keys() == {"2025_Q1"}
+
+    run(batches[1])
+    assert len(reports) == 2
@@ -0,0 +1,18 @@
+from scraper.watchlists import WatchlistIndex
+
+
+def test_scan_reports_terms_nested_in_longer_terms():
+    index = WatchlistIndex([
+        {"name": "telecom", "entities": ["Huawei Technologies Co."]},
+        {"name": "huawei", "entities": ["Huawei"]},
+        {"name": "prc", "countries": ["People's Republic of China"]},
+        {"name": "china", "countries": ["China"]},
+    ])
+    found = index.scan(["Additions of Huawei Technologies Co. in the People's Republic of China"])
+    assert found == ["China", "Huawei", "Huawei Technologies Co.", "People's Republic of China"]
+    assert set(index.fan_out(found)) == {"telecom", "huawei", "prc", "china"}
+
+
+def test_scan_keeps_word_boundaries_and_eccn_paragraphs():
+    index = WatchlistIndex([{"name": "ai", "eccns": ["3A090"], "countries": ["China"]}])
+    assert index.scan(["Chinatown, 3A090.a.1"]) == ["3A090"]